@@ -1,3 +1,8 @@
 
 from show.core import show, Show, noshow, NoShow, fmt, say
 from show.version import __version__
+
+import os as _os
+if _os.environ.get('SHOW_STRIP') or _os.environ.get('SHOW_PRECOMPILE'):
+    from show.importhook import install_from_environ
+    install_from_environ()
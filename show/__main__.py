@@ -0,0 +1,14 @@
+"""
+Command line entry points: ``python -m show index <paths>``, and
+``python -m show run (-m module | script) [args]``.
+"""
+
+import sys
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['run']:
+        from .importhook import run
+        run(sys.argv[2:])
+    else:
+        from .indexer import main
+        sys.exit(main())
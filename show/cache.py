@@ -0,0 +1,157 @@
+"""
+In-memory caches for the results of introspection, optionally bounded in size
+with least-recently-used eviction, and counting their hits, misses, and
+evictions so they can be sized sensibly.
+"""
+
+import weakref
+import threading
+from collections import OrderedDict
+from .util import on_fork
+
+_caches = weakref.WeakSet()     # live caches, for resetting after fork
+
+
+class BoundedCache(object):
+    """
+    A mapping that remembers at most ``maxsize`` entries, evicting the least
+    recently used when full. ``maxsize`` of ``None`` (the default) means
+    unbounded: nothing is ever evicted, but hits and misses are still
+    counted. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def get(self, key, default=None):
+        """
+        Return the value for key (marking it most recently used), or
+        ``default`` if not present.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            if self.maxsize is not None:
+                self._touch(key, value)
+            return value
+
+    def put(self, key, value):
+        """
+        Store value under key, evicting old entries if over the size limit.
+        """
+        with self._lock:
+            self._data[key] = value
+            if self.maxsize is not None:
+                self._touch(key, value)
+                self._evict(self.maxsize)
+
+    def pop(self, key, default=None):
+        """
+        Remove key, returning its value, or ``default`` if not present.
+        """
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def prune(self, predicate):
+        """
+        Remove every entry whose key satisfies predicate. Returns the number
+        removed.
+        """
+        with self._lock:
+            doomed = [k for k in self._data if predicate(k)]
+            for k in doomed:
+                del self._data[k]
+            return len(doomed)
+
+    def resize(self, maxsize):
+        """
+        Change the size limit (``None`` for unbounded), evicting entries at
+        once if the cache is now over it.
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            if maxsize is not None:
+                self._evict(maxsize)
+
+    def clear(self):
+        """
+        Drop all entries and reset the counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Return a dict of the cache's size, limit, and counters.
+        """
+        return dict(size=len(self._data), maxsize=self.maxsize,
+                    hits=self.hits, misses=self.misses,
+                    evictions=self.evictions)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def _touch(self, key, value):
+        """
+        Mark key as most recently used.
+        """
+        try:
+            self._data.move_to_end(key)
+        except AttributeError:      # pragma: no cover - Python 2
+            del self._data[key]
+            self._data[key] = value
+
+    def _evict(self, maxsize):
+        """
+        Drop least recently used entries until no more than maxsize remain.
+        """
+        while len(self._data) > maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+
+@on_fork
+def _renew_locks():
+    """
+    Give every cache a fresh lock in a forked child, lest one held by some
+    other thread at the time of the fork stay locked forever. The cached
+    contents remain valid.
+    """
+    for cache in list(_caches):
+        cache._lock = threading.Lock()
+
+
+class MemoMetaclass(type):
+    """
+    Memoizing metaclass, like ``mementos.MementoMetaclass``, but giving each
+    class its own ``BoundedCache`` as ``cls.memo``, rather than sharing one
+    unbounded global cache. Instances are keyed by their constructor
+    arguments. Bound the cache with ``cls.memo.resize(n)``; inspect it with
+    ``cls.memo.stats()``.
+    """
+
+    def __init__(cls, name, bases, attrs):
+        super(MemoMetaclass, cls).__init__(name, bases, attrs)
+        cls.memo = BoundedCache()
+
+    def __call__(cls, *args, **kwargs):
+        key = args + tuple(sorted(kwargs.items())) if kwargs else args
+        instance = cls.memo.get(key)
+        if instance is None:
+            instance = type.__call__(cls, *args, **kwargs)
+            cls.memo.put(key, instance)
+        return instance
@@ -0,0 +1,309 @@
+"""
+Show output from many processes, gathered by one writer. Forked workers
+(``multiprocessing`` pools, gunicorn, and the like) that all write to an
+inherited stderr or stdout tear each other's lines. Instead, start a
+``Collector`` in the parent, before forking; each process then sends its
+output over a Unix socket, and the collector writes it out whole, a line at
+a time, each line tagged with the PID of the process that showed it::
+
+    show.use_collector()        # in the parent, before forking
+
+    [4242] x: 1
+    [4243] x: 2
+
+Workers queue their output on an ``AsyncSink``, which sends it in batches,
+so showing costs a worker little more than appending to a queue. Processes
+started other than by forking (e.g. ``multiprocessing``'s ``spawn``) find
+the collector by the ``SHOW_COLLECTOR`` environment variable, and join in by
+calling ``show.use_collector()`` themselves. POSIX only.
+"""
+
+import os
+import sys
+import errno
+import shutil
+import socket
+import select
+import atexit
+import weakref
+import tempfile
+import threading
+from .writer import write_record
+from .sink import _flush_all
+from .util import on_fork
+
+ENVIRON_KEY = 'SHOW_COLLECTOR'
+
+_collectors = weakref.WeakSet()  # live collectors, to close at exit
+_clients = weakref.WeakSet()     # live clients, to disconnect after fork
+_finalizing = [None]             # pid that registered a worker-exit flush
+
+
+class Collector(object):
+    """
+    Listens on a Unix socket (at ``address``, by default a new temporary
+    one) for output from ``CollectorClient`` connections, and writes it to
+    ``files`` from a background thread. Complete lines are written as they
+    arrive, prefixed by ``tag``, formatted with the sender's ``pid``.
+    """
+
+    def __init__(self, files=None, address=None, tag='[{pid}] '):
+        if files is None:
+            files = [sys.stdout]
+        elif not isinstance(files, (list, tuple)):
+            files = [files]
+        self.files = list(files)
+        self.tag = tag
+        self._tmpdir = None
+        if address is None:
+            self._tmpdir = tempfile.mkdtemp(prefix='show-')
+            address = os.path.join(self._tmpdir, 'collector.sock')
+        self.address = address
+        self.clients = 0        # connections accepted
+        self.lines = 0          # lines written
+        self.errors = 0         # failed writes
+        self._pid = os.getpid()
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(address)
+        self._listener.listen(128)
+        self._wake_r, self._wake_w = os.pipe()
+        self._conns = {}        # socket => [tag, unfinished line]
+        self._thread = threading.Thread(target=self._run, name='show-collector')
+        self._thread.daemon = True
+        self._thread.start()
+        os.environ[ENVIRON_KEY] = address
+        _collectors.add(self)
+
+    def close(self):
+        """
+        Write out what has been received, and stop listening. Only the
+        process that started the collector can close it; in others (such
+        as forked children), this just lets go of the inherited sockets.
+        """
+        if self._thread is None:
+            return
+        if self._pid == os.getpid():
+            os.write(self._wake_w, b'x')
+            self._thread.join()
+            if os.environ.get(ENVIRON_KEY) == self.address:
+                del os.environ[ENVIRON_KEY]
+            if self._tmpdir:
+                shutil.rmtree(self._tmpdir, ignore_errors=True)
+            else:
+                _unlink(self.address)
+        self._release()
+
+    def stats(self):
+        """
+        Return a dict of the collector's counters.
+        """
+        return dict(clients=self.clients, connected=len(self._conns),
+                    lines=self.lines, errors=self.errors)
+
+    def _release(self):
+        """
+        Close this process's handles on the sockets and wake-up pipe.
+        """
+        for sock in [self._listener] + list(self._conns):
+            sock.close()
+        self._conns = {}
+        for fd in (self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._thread = None
+
+    def _run(self):
+        """
+        Writer thread: accept connections, read what they send, and write
+        out complete lines.
+        """
+        while True:
+            ready = select.select([self._listener, self._wake_r] +
+                                  list(self._conns), [], [])[0]
+            for r in ready:
+                if r is self._wake_r:
+                    self._finish()
+                    return
+                elif r is self._listener:
+                    conn = self._listener.accept()[0]
+                    self._conns[conn] = [None, b'']
+                    self.clients += 1
+                else:
+                    self._receive(r)
+
+    def _receive(self, conn):
+        """
+        Read from a connection, writing out the lines it completes.
+        """
+        try:
+            data = conn.recv(65536)
+        except socket.error:
+            data = b''
+        if data:
+            self._feed(conn, data)
+        else:
+            self._hangup(conn)
+
+    def _feed(self, conn, data):
+        """
+        Add data received on conn to its unfinished line, and write out the
+        complete lines. A connection's first line is the sender's PID.
+        """
+        state = self._conns[conn]
+        lines = (state[1] + data).split(b'\n')
+        state[1] = lines.pop()
+        if state[0] is None and lines:
+            pid = lines.pop(0).decode('ascii', 'replace')
+            state[0] = self.tag.format(pid=pid)
+        if lines:
+            self._write(state[0], lines)
+
+    def _hangup(self, conn):
+        """
+        A connection has closed; write any final, unterminated line.
+        """
+        tag, rest = self._conns.pop(conn)
+        conn.close()
+        if rest and tag is not None:
+            self._write(tag, [rest])
+
+    def _finish(self):
+        """
+        Read whatever connections have already sent, then hang up on them.
+        """
+        self._listener.setblocking(False)
+        while True:
+            try:
+                self._conns[self._listener.accept()[0]] = [None, b'']
+            except socket.error:
+                break
+        for conn in list(self._conns):
+            conn.setblocking(False)
+            while True:
+                try:
+                    data = conn.recv(65536)
+                except socket.error:
+                    break
+                if not data:
+                    break
+                self._feed(conn, data)
+            self._hangup(conn)
+
+    def _write(self, tag, lines):
+        """
+        Write lines, tagged, to each of the files, in one call each.
+        """
+        text = ''.join(tag + line.decode('utf-8', 'replace') + '\n'
+                       for line in lines)
+        for f in self.files:
+            try:
+                write_record(f, text)
+                f.flush()
+            except Exception:
+                self.errors += 1
+        self.lines += len(lines)
+
+
+class CollectorClient(object):
+    """
+    File-like writer that sends its output to the ``Collector`` listening
+    at ``address``. Each process makes its own connection, on its first
+    write; a forked child reconnects rather than sharing its parent's.
+    Output that cannot be sent is counted (``errors``) and dropped.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self.errors = 0
+        self._sock = None
+        self._pid = None
+        _clients.add(self)
+
+    def write(self, s):
+        if self._pid != os.getpid():
+            self._connect()
+        if self._sock is not None:
+            try:
+                self._sock.sendall(s.encode('utf-8'))
+            except socket.error:
+                self.errors += 1
+                self._disconnect()
+        else:
+            self.errors += 1
+        return len(s)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self._disconnect()
+
+    def _connect(self):
+        """
+        Connect to the collector, introducing this process by its PID.
+        """
+        self._disconnect()
+        self._pid = os.getpid()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.address)
+            sock.sendall('{0}\n'.format(self._pid).encode('ascii'))
+        except socket.error:
+            sock.close()
+            return
+        self._sock = sock
+        _flush_at_worker_exit()
+
+    def _disconnect(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except socket.error:
+                pass
+            self._sock = None
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except OSError as e:
+        if e.errno != errno.ENOENT:
+            raise
+
+
+def _flush_at_worker_exit():
+    """
+    ``multiprocessing`` workers exit without running ``atexit`` handlers, so
+    pending output would be lost. Have them flush sinks on the way out.
+    """
+    mp_util = sys.modules.get('multiprocessing.util')
+    if mp_util is not None and _finalizing[0] != os.getpid():
+        _finalizing[0] = os.getpid()
+        mp_util.Finalize(None, _flush_all, exitpriority=10)
+
+
+@on_fork
+def _forked():
+    """
+    In a forked child, let go of inherited collector and client sockets.
+    """
+    for client in list(_clients):
+        client._disconnect()
+    for collector in list(_collectors):
+        if collector._thread is not None:
+            collector._release()
+
+
+@atexit.register
+def _close_all():
+    """
+    At exit, flush output still queued for collectors, then close them.
+    """
+    _flush_all()
+    for collector in list(_collectors):
+        try:
+            collector.close()
+        except Exception:
+            pass
@@ -6,6 +6,8 @@ import inspect
 import sys
 import os
 import re
+import time
+import threading
 import six
 import fnmatch
 from options import Options, OptionsClass, OptionsContext, Transient, Unset
@@ -22,6 +24,14 @@ from .util import *
 from .util import _PY2
 from .repr import *
 from .exceptions import *
+from .defer import Deferred, snapshot, copy_policy
+from .sink import AsyncSink
+from .jsonl import dumps, arg_entry
+from .sampling import Sampler, suppressed_note
+from .writer import ShowSay, write_record
+from .collector import Collector, CollectorClient, ENVIRON_KEY
+from .recorder import FlightRecorder
+from .summary import summary_repr
 from .version import __version__
 from functools import wraps
 
@@ -38,6 +48,23 @@ CallArgs.add_target_func('show')
 
 QUOTE_CHARS = ('"', "'", '"""', "'''")
 
+# Keyword arguments describing a call, rather than setting options for it
+_CALL_KEYS = frozenset(['_callframe', '_argnames'])
+
+
+def _detached(opts):
+    """
+    Return a single-layer copy of opts without the call frame, for
+    rendering after the call has returned.
+    """
+    values = {}
+    for m in reversed(opts.maps):
+        values.update(m)
+    values.pop('_callframe', None)
+    detached = Options.__new__(Options)
+    object.__setattr__(detached, 'maps', [values])
+    return detached
+
 
 # Probably cannot make `show` work from the interactive Python
 # REPL because it constantly returns `<stdin>` as the filename
@@ -79,6 +106,10 @@ class Show(OptionsClass):
         sep="  ",           # separate items with two spaces, by default
         retvalue=False,     # return the value printed?
         digits=4,           # number digits to show floating point values
+        maxlen=MAXLEN,      # character budget for each value's repr
+        maxitems=MAXITEMS,  # most items to show from any one container
+        edgeitems=EDGEITEMS, # items to show at each end of abbreviated arrays
+        summarize=None,     # summarize numeric data of more items than this
         props=Transient,    # props desired to print (given at call time)
         omit=Transient,     # vars not to print (for those like show.locals,
                             # show.dir, etc that might default to many)
@@ -90,18 +121,27 @@ class Show(OptionsClass):
         show=True,          # show or not
         quietplaces=[],     # experimental: list of no-show places
         _callframe=Transient,
+        _argnames=Transient, # argument names, if known before the call
+        defer=False,        # render output later (by an AsyncSink or recorder)?
+        jsonl=False,        # emit a JSON object per call, not text?
+        every=None,         # show only every Nth call at each call site
+        sample=None,        # show calls with this probability (0 to 1)
+        rate=None,          # show at most this many calls/second per site
+        burst=None,         # ...with bursts of up to this many (default rate)
+        _suppressed=Transient, # calls skipped at this site since last shown
         wrap = None,        # experimental: promote say options
     )
 
     def __init__(self, **kwargs):
-        self.options = self.opts = Show.options.push(kwargs)
+        self.options = Show.options.push(kwargs)
         self.fmt = Fmt()
-        self.say = SayReturn()
+        self.say = ShowSay()
         self._watching = {} # remembers last value of variables for given frames
+        self._flat = None   # (validity key, flattened options snapshot), unscoped
         self.__version__ = __version__
 
 
-    def call_location(self, caller):
+    def call_location(self, caller, opts=None):
         """
         Create a call location string indicating where a show() was called.
         """
@@ -112,7 +152,7 @@ class Show(OptionsClass):
             return "<stdin>:{0}".format(len(history.lines))
         else:
             module_name = ""
-            if self.opts.show_module:
+            if (opts or self._scoped_options()).show_module:
                 filepath = caller.f_locals.get('__file__', caller.f_globals.get('__file__', 'UNKNOWN'))
                 filename = os.path.basename(filepath)
                 module_name = re.sub(r'.py', '', filename)
@@ -134,17 +174,17 @@ class Show(OptionsClass):
         with double-{{ so they are not interpreted as format template characters
         when the composed string is eventually output by ``say``.
         """
-        fvalue = self.opts.fmtfunc(value, opts)
+        fvalue = opts.fmtfunc(value, opts)
         return self.fmt.escape(fvalue)
 
-    def code_repr(self, code):
+    def code_repr(self, code, opts=None):
         """
         Return a formatted string for code. If there are any internal brace
         characters, they are escaped (doubled) so that they are not interpreted
         as format template characters when the composed string is eventually
         output by ``say``.
         """
-        return self.fmt.escape(self.opts.fmtcode(code))
+        return self.fmt.escape((opts or self._scoped_options()).fmtcode(code))
 
         # TODO: remove value_repr and code_repr given say.verbatim
 
@@ -187,6 +227,17 @@ class Show(OptionsClass):
         # the repr will be to our liking? The label format never changes. Wouldn't it be easier to call get_repr
         # with some kind of display hint?
 
+    def arg_format_summary(self, name, value, caller, opts):
+        """
+        Format a single argument as a numeric summary, if it is numeric.
+        """
+        if name.startswith(QUOTE_CHARS):
+            return fmt(value, _callframe=caller)
+        summary = summary_repr(value, opts)
+        if summary is None:
+            return self.arg_format(name, value, caller, opts)
+        return "{0}: {1}".format(name, self.fmt.escape(summary))
+
     def arg_format_dir(self, name, value, caller, opts):
         """
         Format a single argument to show items of a collection.
@@ -236,7 +287,7 @@ class Show(OptionsClass):
             return fmt(value, _callframe=caller)
         else:
             try:
-                props = self.opts.props
+                props = opts.props
                 if props and isinstance(props, basestring):
                     proplist = props.split(',') if ',' in props else props.split()
                     proplist = [ p.strip() for p in proplist ]
@@ -248,7 +299,8 @@ class Show(OptionsClass):
                         propkeys = [ p for p in propkeys if not isinstance(getattr(value, p), FUNKY) ]
                     proplist = sorted(propkeys, key=lambda x: x.replace('_','~'))
 
-                propvals = [ "    {0}={1}".format(p, ellipsis(self.value_repr(getattr(value, p), opts))) for p in proplist ]
+                propopts = opts.push(dict(maxlen=232)) # no more than ellipsis will keep
+                propvals = [ "    {0}={1}".format(p, ellipsis(self.value_repr(getattr(value, p), propopts))) for p in proplist ]
 
                 # change out brace charactes likely to cause problems
                 LUBRACE, RUBRACE = six.u("\u2774"), six.u("\u2775")
@@ -257,27 +309,33 @@ class Show(OptionsClass):
 
                 if hasattr(value, 'items'):
                     if opts.shape == 'compact':
-                        propvals = [ "{0}={1}".format(k, ellipsis(self.value_repr(v, opts)))
+                        propvals = [ "{0}={1}".format(k, ellipsis(self.value_repr(v, propopts)))
                                   for k,v in value.items() ]
                         return "{0}: {1}({2})".format(name, type(value).__name__, ", ".join(propvals))
                     else:
-                        propvals += [ "    {0}: {1}".format(k, ellipsis(self.value_repr(v, opts)))
+                        propvals += [ "    {0}: {1}".format(k, ellipsis(self.value_repr(v, propopts)))
                                      for k,v in value.items() ]
                 return "{0}{1}:\n{2}".format(name, typename(value), '\n'.join(propvals))
             except Exception as e:
                 return "{0}{1}: {2}".format(name, typename(value), self.value_repr(value, opts))
 
-    def get_arg_tuples(self, caller, values):
+    def get_arg_tuples(self, caller, values, argnames=None):
         """
         Return a list of argument (name, value) tuples.
         :caller: The calling frame.
         :values: Argument values.
+        :argnames: Argument names, if already known (e.g. precompiled into
+                   the call by ``show.importhook``). Saves introspection.
         """
-        filename, lineno = frame_to_source_info(caller)
-        try:
-            argnames = CallArgs(filename, lineno).args
-        except ArgsUnavailable:
-            argnames = ['?'] * len(values)
+        if argnames:
+            return list(zip(argnames, values))
+        argnames = position_args(caller)
+        if argnames is None:
+            filename, lineno = frame_to_source_info(caller)
+            try:
+                argnames = CallArgs(filename, lineno).args
+            except ArgsUnavailable:
+                argnames = ['?'] * len(values)
         return list(zip(argnames, list(values)))
 
     def set(self, **kwargs):
@@ -286,6 +344,7 @@ class Show(OptionsClass):
         """
         self.options.set(**kwargs)
         self.fmt.set(**kwargs)
+        options_changed()
 
         # FIXME: with show.settings() broken - needs better rules for
         # passing values into the context manager
@@ -295,6 +354,60 @@ class Show(OptionsClass):
         # NB this is the paradigm usage of ``options``'s "leftovers" strategy
 
 
+    def use_sink(self, **kwargs):
+        """
+        Send this Show's output through a background ``AsyncSink``, wrapping
+        its current output files, so that show calls need not wait on slow
+        output. kwargs (``maxsize``, ``policy``, ``batch``) configure the
+        sink. ``defer=True`` also defers formatting values to the sink's
+        thread (see ``show.defer``). Returns the sink, for flushing,
+        closing, and stats.
+        """
+        defer = kwargs.pop('defer', None)
+        sink = AsyncSink(self.say.options.files, **kwargs)
+        self.say.setfiles([sink])
+        if defer is not None:
+            self.set(defer=defer)
+        return sink
+
+    def use_collector(self, address=None, **kwargs):
+        """
+        Send this Show's output, from this and any processes forked from it,
+        to a single ``Collector``, which writes it out line by line, tagged
+        with the showing process's PID (see ``show.collector``). Connects to
+        the collector at ``address`` (or named by the ``SHOW_COLLECTOR``
+        environment variable) if there is one; else starts one here, writing
+        to this Show's current output files. Output is queued and sent in
+        batches by an ``AsyncSink``, configured by kwargs as for
+        ``use_sink``. Returns the sink.
+        """
+        address = address or os.environ.get(ENVIRON_KEY)
+        if not address:
+            address = Collector(self.say.options.files).address
+        self.say.setfiles([CollectorClient(address)])
+        return self.use_sink(**kwargs)
+
+    def use_recorder(self, size=1000, file=None, install=True, **kwargs):
+        """
+        Keep this Show's output in a ``FlightRecorder``, a ring buffer of the
+        last ``size`` records, rather than writing it; it is written to
+        ``file`` (default ``sys.stderr``) only when dumped. Unless
+        ``install`` is false, it is dumped on unhandled exceptions--and, if
+        given a ``signum`` such as ``signal.SIGUSR1``, on that signal (see
+        ``FlightRecorder.install``). ``defer=True`` also defers formatting
+        values until a dump (see ``show.defer``). Returns the recorder, for
+        ``dump()``.
+        """
+        defer = kwargs.pop('defer', None)
+        kwargs.setdefault('signum', None)
+        recorder = FlightRecorder(size, file)
+        if install:
+            recorder.install(**kwargs)
+        self.say.setfiles([recorder])
+        if defer is not None:
+            self.set(defer=defer)
+        return recorder
+
     def clone(self, **kwargs):
         """
         Create a child instance whose options are chained to this instance's
@@ -304,6 +417,7 @@ class Show(OptionsClass):
         """
         child = Show()
         child.options = self.options.push(kwargs)
+        options_changed()
 
         # introspect caller to find what is being assigned to
         caller = inspect.currentframe().f_back
@@ -313,21 +427,96 @@ class Show(OptionsClass):
         CallArgs.add_target_func(name)
         return child
 
+    def settings(self, **kwargs):
+        """
+        Open a context manager for a `with` statement. Temporarily change
+        settings for the duration of the with, for the current thread (or
+        asyncio task) only.
+        """
+        return ShowContext(self, kwargs)
+
+    def _scoped_options(self):
+        """
+        Return this Show's options as currently in effect: those set by the
+        innermost ``with self.settings(...)`` block of the current thread or
+        task, else its own.
+        """
+        scope = _scope.get()
+        if scope and self in scope:
+            return scope[self][0]
+        return self.options
+
+    def _flat_options(self):
+        """
+        Return a snapshot of this Show's options, with its chain of option
+        layers flattened into one, for cheap per-call option layers and
+        lookups. Outside any ``settings`` block, the snapshot is kept on the
+        Show; within one, on that block's scope, so that threads in different
+        scopes do not displace each other's. Cached until options change via
+        ``set`` or ``clone`` (or the chain of layers itself changes). Options
+        set directly, bypassing those (e.g. ``show.options.set(...)``),
+        should be followed by a call to ``options_changed()``.
+        """
+        scope = _scope.get()
+        entry = scope.get(self) if scope else None
+        if entry is None:
+            maps, cached = self.options.maps, self._flat
+        else:
+            maps, cached = entry[0].maps, entry[1]
+        key = (_generation[0], tuple(map(id, maps)))
+        if cached is None or cached[0] != key:
+            top = _FlatOptions()
+            for m in reversed(maps):
+                top.update(m)
+            top.fmtkeys = [k for k in top if k in self.fmt.options]
+            flat = Options()
+            flat.maps[0] = top
+            cached = (key, flat)
+            if entry is None:
+                self._flat = cached
+            else:
+                entry[1] = cached
+        return cached[1]
+
+    def _fmt_kwargs(self, opts):
+        """
+        Return the options to pass on to ``self.fmt``. For fast-path options
+        (one layer over a snapshot), just those that ``Fmt`` knows, to
+        spare it sifting through them all.
+        """
+        if len(opts.maps) == 2 and type(opts.maps[1]) is _FlatOptions:
+            return dict((k, opts[k]) for k in opts.maps[1].fmtkeys)
+        return opts
+
     def _showcore(self, args, kwargs, caller, formatter, opts):
         """
         Do core work of showing the args.
         """
-        self.opts = opts
+        # Sample before doing any real work
+        if opts.every or opts.sample is not None or opts.rate is not None:
+            site = (caller.f_code, caller.f_lineno)
+            admitted, suppressed = sampler.admit(site, opts.every, opts.sample,
+                                                 opts.rate, opts.burst)
+            if not admitted:
+                return None
+            opts._suppressed = suppressed
 
         # Introspect for argument names
-        argtuples = self.get_arg_tuples(caller, args)
+        argtuples = self.get_arg_tuples(caller, args, opts._argnames)
+
+        if opts.jsonl:
+            return self._show_json(argtuples, caller, formatter, opts)
+        if opts.defer and not opts.retvalue and lambda_eval(opts.show):
+            return self._defer(argtuples, caller, formatter, opts)
 
         # Construct the formatted result string
         fvals = [ formatter(name, value, caller, opts) for name, value in argtuples ]
+        if opts._suppressed:
+            fvals.append(suppressed_note(opts._suppressed))
         valstr = hjoin(fvals, sep=opts.sep)
 
         if opts.where:
-            locstr = self.call_location(caller) + ':'
+            locstr = self.call_location(caller, opts) + ':'
             locval = [ hjoin([locstr, valstr]) ]
             # does Fmt need to be hjoin line aware?
         else:
@@ -338,7 +527,7 @@ class Show(OptionsClass):
         # print('☾ _showcore: opts.show =', repr(opts.show), 'silent =', repr(silent))
         # kwargs['silent'] = silent
         kwargs['retvalue'] = opts.retvalue
-        retval = self.fmt(*locval, **opts)  # changed
+        retval = self.fmt(*locval, **self._fmt_kwargs(opts))
         if not silent:
             retval = retval.replace("{", "{{").replace("}", "}}")
             self.say(retval)
@@ -347,15 +536,111 @@ class Show(OptionsClass):
         if opts.retvalue and not silent:
             return retval
 
+    def _defer(self, argtuples, caller, formatter, opts):
+        """
+        Capture a show call, to be formatted and emitted later by the
+        ``AsyncSink`` or ``FlightRecorder`` it is written to. Only snapshots of the values are
+        taken now (see ``show.defer``), plus anything that depends on the
+        calling frame: the call location and any quoted (interpolated)
+        arguments. The frame itself is not kept, lest it (and all its
+        locals) live as long as the record.
+        """
+        fvals = [formatter(name, value, caller, opts)
+                 if name.startswith(QUOTE_CHARS) else None
+                 for name, value in argtuples]
+        argtuples = [(name, snapshot(value)) for name, value in argtuples]
+        locstr = self.call_location(caller, opts) + ':' if opts.where else None
+        sayopts = self.say.options.push({})
+        opts = _detached(opts)
+
+        def render():
+            vals = [fval if fval is not None else formatter(name, value, None, opts)
+                    for fval, (name, value) in zip(fvals, argtuples)]
+            if opts._suppressed:
+                vals.append(suppressed_note(opts._suppressed))
+            valstr = hjoin(vals, sep=opts.sep)
+            locval = [hjoin([locstr, valstr])] if locstr else [valstr]
+            return self.say._outstr(self.fmt(*locval, **opts), sayopts)
+
+        self._emit_record(Deferred(render), sayopts.files)
+
+    def _emit_record(self, record, files):
+        """
+        Write a record--a string, or a ``Deferred``--to the given files. If
+        any of them cannot render deferred records later (as an ``AsyncSink``
+        or ``FlightRecorder`` can), a deferred record is rendered now, and the
+        result written instead.
+        """
+        if callable(record) and not all(getattr(f, 'accepts_deferred', False)
+                                        for f in files):
+            record = record()
+        for f in files:
+            write_record(f, record)
+
+    def _show_json(self, argtuples, caller, formatter, opts):
+        """
+        Emit a show call as a JSON object, on a line of its own (see
+        ``show.jsonl``). Deferrable, like text output, except when the
+        result is to be returned.
+        """
+        if not lambda_eval(opts.show):
+            return None
+        filename, lineno = frame_to_source_info(caller)
+        meta = {
+            'ts': time.time(),
+            'where': self.call_location(caller, opts),
+            'file': filename,
+            'line': lineno,
+            'func': caller.f_code.co_name,
+            'pid': os.getpid(),
+            'tid': threading.current_thread().ident,
+        }
+        if opts._suppressed:
+            meta['suppressed'] = opts._suppressed
+        quoted = [formatter(name, value, caller, opts)
+                  if name.startswith(QUOTE_CHARS) else None
+                  for name, value in argtuples]
+        defer = opts.defer and not opts.retvalue
+        if defer:
+            argtuples = [(name, snapshot(value)) for name, value in argtuples]
+            opts = _detached(opts)
+
+        def render():
+            meta['args'] = [arg_entry(name, value, opts) if q is None else
+                            {'name': name, 'type': 'str', 'repr': q}
+                            for q, (name, value) in zip(quoted, argtuples)]
+            return dumps(meta) + '\n'
+
+        record = Deferred(render)
+        if not defer:
+            record = record()
+        self._emit_record(record, self.say.options.files)
+        if opts.retvalue:
+            return record[:-1]
+
+    def copy_policy(self, cls, policy):
+        """
+        Set how values of type cls are captured when output is deferred:
+        ``'ref'``, ``'shallow'``, or ``'deep'`` (copy). See ``show.defer``.
+        """
+        copy_policy(cls, policy)
+
     def __call__(self, *args, **kwargs):
         """
         Main entry point for Show objects. Invoked when they are called.
         So for most intents and purposes, this is the `show()` entry point.
         """
         caller = self._get_callframe(kwargs)
-        opts = self.opts = self.options.push(kwargs)
-        opts.update(kwargs) # in flux; here for options that don't get passed
-                            # through - need more coordination with options module
+        if _CALL_KEYS.issuperset(kwargs):
+            # fast path: no per-call options, beyond the call frame and any
+            # precompiled argument names
+            opts = Options.__new__(Options)
+            object.__setattr__(opts, 'maps', [kwargs, self._flat_options().maps[0]])
+            kwargs = {}
+        else:
+            opts = self._scoped_options().push(kwargs)
+            opts.update(kwargs) # in flux; here for options that don't get passed
+                                # through - need more coordination with options module
         formatter = self.arg_format_props if opts.props else self.arg_format
         result = self._showcore(args, kwargs, caller, formatter, opts)
         return result
@@ -365,15 +650,25 @@ class Show(OptionsClass):
         Show items of a collection.
         """
         caller = self._get_callframe(kwargs)
-        opts = self.options.push(kwargs)
+        opts = self._scoped_options().push(kwargs)
         return self._showcore(args, kwargs, caller, self.arg_format_items, opts)
 
+    def summary(self, *args, **kwargs):
+        """
+        Show a summary of numeric data: shape, type, min, max, mean,
+        standard deviation, counts of NaNs and infinities, and a histogram.
+        Values that are not numeric are shown as usual.
+        """
+        caller = self._get_callframe(kwargs)
+        opts = self._scoped_options().push(kwargs)
+        return self._showcore(args, kwargs, caller, self.arg_format_summary, opts)
+
     def dir(self, *args, **kwargs):
         """
         Show the attributes possible for the given object(s)
         """
         caller = self._get_callframe(kwargs)
-        opts = self.options.push(kwargs)
+        opts = self._scoped_options().push(kwargs)
         opts.setdefault('omit', '__*')
         opts.setdefault('verbose', True)
         opts.update(kwargs) # special, to pass down wrap etc
@@ -387,7 +682,7 @@ class Show(OptionsClass):
         integrated as yet. Just a start.
         """
         caller = self._get_callframe(kwargs)
-        opts = self.options.push(kwargs)
+        opts = self._scoped_options().push(kwargs)
 
         return self.say(pformat(*args, **kwargs))
 
@@ -396,7 +691,7 @@ class Show(OptionsClass):
         Show properties of objects.
         """
         caller = self._get_callframe(kwargs)
-        opts = self.opts = self.options.push(kwargs)
+        opts = self._scoped_options().push(kwargs)
         opts.setdefault('omit', '__*')
         if len(args) > 1 and isinstance(args[-1], str):
             used = opts.addflat([args[-1]], ['props'])
@@ -419,7 +714,7 @@ class Show(OptionsClass):
         return values, silence, etc.
         """
         caller = self._get_callframe(kwargs)
-        opts = self.opts = self.options.push(kwargs)
+        opts = self._scoped_options().push(kwargs)
         arginfo = inspect.getargvalues(caller)
         argstr = inspect.formatargvalues(*arginfo)
         funcname = caller.f_code.co_name
@@ -440,7 +735,7 @@ class Show(OptionsClass):
         Show all local vars, plus any other values mentioned.
         """
         caller = self._get_callframe(kwargs)
-        opts = self.opts = self.options.push(kwargs)
+        opts = self._scoped_options().push(kwargs)
         opts.setdefault('omit', '')
         assert not args  # for now
         locdict = caller.f_locals
@@ -451,7 +746,7 @@ class Show(OptionsClass):
         # Construct the result string
         parts = [ self.arg_format(name, locdict[name], caller, opts) for name in names ]
         valstr = opts.sep.join(parts)
-        locval = [ self.call_location(caller) + ":  ", valstr ] if opts.where else [ valstr ]
+        locval = [ self.call_location(caller, opts) + ":  ", valstr ] if opts.where else [ valstr ]
 
         # Emit the result string, and optionally return it
         kwargs['silent'] = not lambda_eval(opts.show)
@@ -470,7 +765,7 @@ class Show(OptionsClass):
         normal output, but generally is intended as a marker.
         """
         caller = self._get_callframe(kwargs)
-        opts = method_push(self.options, self.where.__kwdefaults__, kwargs)
+        opts = method_push(self._scoped_options(), self.where.__kwdefaults__, kwargs)
         opts.where = True
         show('where options:', opts, kwargs)
         return self._showcore(args, kwargs, caller, self.arg_format, opts)
@@ -480,7 +775,7 @@ class Show(OptionsClass):
         Show the local variables, then again only when changed.
         """
         caller = self._get_callframe(kwargs)
-        opts = self.opts = self.options.push(kwargs)
+        opts = self._scoped_options().push(kwargs)
 
         f_locals = caller.f_locals
         _id = id(f_locals)
@@ -493,7 +788,7 @@ class Show(OptionsClass):
                                 not (isInteractive and (k == 'In' or k == 'Out'))
                             ]
         if args:
-            argtuples = self.get_arg_tuples(caller, args)
+            argtuples = self.get_arg_tuples(caller, args, opts._argnames)
             valitems.extend(argtuples)
 
         valdict = dict(valitems)
@@ -515,7 +810,7 @@ class Show(OptionsClass):
             valstr = opts.sep.join([ self.arg_format(name, to_show[name], caller, opts) for name in names ])
         else:
             valstr = "no changes" # six.u('\u2205')
-        locval = [ self.call_location(caller) + ":  ", valstr ] if opts.where else [ valstr ]
+        locval = [ self.call_location(caller, opts) + ":  ", valstr ] if opts.where else [ valstr ]
 
         # Emit the result string, and optionally return it
         kwargs['silent'] = not lambda_eval(opts.show)
@@ -553,7 +848,7 @@ class Show(OptionsClass):
             dargs = []
             no_args = True
 
-        opts = method_push(self.options, self.inout.__kwdefaults__, dkwargs)
+        opts = method_push(self._scoped_options(), self.inout.__kwdefaults__, dkwargs)
 
         # mkwargs = self.meth_defaults.get('inout', {}).copy()
         # mkwargs.update(dkwargs)
@@ -579,7 +874,7 @@ class Show(OptionsClass):
                 argitems = list(zip(argnames, args)) + list(kwargs.items())
                 argcore = ', '.join('{0}={1!r}'.format(*argtup) for argtup in argitems)
                 callstr = ''.join([func.__name__, '(', argcore, ')'])
-                fmtcallstr = self.code_repr(callstr)
+                fmtcallstr = self.code_repr(callstr, opts)
                 if not only_out and func.__name__ not in opts.quietplaces:
                     self.say(fmtcallstr, **opts) # changed
                 try:
@@ -658,7 +953,7 @@ class Show(OptionsClass):
             # if in quiet place, turn show off
             # note because callframe interpretation is active, must always consider
             # it, even if not used for variable interpolation
-            if caller.f_code.co_name in self.options.quietplaces:
+            if caller.f_code.co_name in self._scoped_options().quietplaces:
                 kwargs.setdefault('show', False)
         return caller
 
@@ -666,25 +961,25 @@ class Show(OptionsClass):
 
     def blank_lines(self, *args, **kwargs):
         self._get_callframe(kwargs)
-        opts = method_push(self.options, self.blank_lines.__kwdefaults__, kwargs)
+        opts = method_push(self._scoped_options(), self.blank_lines.__kwdefaults__, kwargs)
         if opts.show:
             self.say.blank_lines(*args, **opts)
 
     def hr(self, *args, **kwargs):
         self._get_callframe(kwargs)
-        opts = method_push(self.options, self.hr.__kwdefaults__, kwargs)
+        opts = method_push(self._scoped_options(), self.hr.__kwdefaults__, kwargs)
         if opts.show:
             self.say.hr(*args, **opts)
 
     def title(self, *args, **kwargs):
         self._get_callframe(kwargs)
-        opts = method_push(self.options, self.title.__kwdefaults__, kwargs)
+        opts = method_push(self._scoped_options(), self.title.__kwdefaults__, kwargs)
         if opts.show:
             self.say.title(*args, **opts)
 
     def sep(self, *args, **kwargs):
         self._get_callframe(kwargs)
-        opts = method_push(self.options, self.sep.__kwdefaults__, kwargs)
+        opts = method_push(self._scoped_options(), self.sep.__kwdefaults__, kwargs)
         if opts.show:
             self.say.sep(*args, **opts)
 
@@ -702,6 +997,83 @@ enable_func_set(Show.hr, Show)
 enable_func_set(Show.title, Show)
 enable_func_set(Show.sep, Show)
 
+class ShowContext(object):
+    """
+    Context manager for ``with show.settings(...):``. The settings apply only
+    to show calls made within the ``with`` block by the thread (or, where
+    ``contextvars`` is available, the asyncio task) that entered it. Other
+    threads and tasks using the same Show are unaffected.
+    """
+
+    def __init__(self, caller, kwargs):
+        self.caller = caller
+        if 'opts' in kwargs:
+            kwargs.update(kwargs.pop('opts'))
+        self.kwargs = kwargs
+        self._token = None
+
+    def __enter__(self):
+        scope = dict(_scope.get() or {})
+        scope[self.caller] = [self.caller._scoped_options().push(self.kwargs), None]
+        self._token = _scope.set(scope)
+        return self.caller
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _scope.reset(self._token)
+
+
+try:
+    from contextvars import ContextVar
+except ImportError:     # Python < 3.7: scope settings per thread
+    class ContextVar(object):
+        """
+        Minimal stand-in for ``contextvars.ContextVar``, holding a value
+        per thread. ``reset`` takes the prior value that ``set`` returns.
+        """
+
+        def __init__(self, name, default=None):
+            self.name = name
+            self._default = default
+            self._local = threading.local()
+
+        def get(self):
+            return getattr(self._local, 'value', self._default)
+
+        def set(self, value):
+            prior = self.get()
+            self._local.value = value
+            return prior
+
+        def reset(self, token):
+            self._local.value = token
+
+
+_scope = ContextVar('show_scope', default=None) # Show => [options, snapshot], within settings()
+
+
+class _FlatOptions(dict):
+    """
+    The one layer of a flattened options snapshot (see
+    ``Show._flat_options``), noting which of its keys ``Fmt`` knows.
+    """
+    __slots__ = ('fmtkeys',)
+
+
+_generation = [0]   # bumped whenever Show options change
+
+
+def options_changed():
+    """
+    Note that Show options have changed, so that cached snapshots of them
+    (see ``Show._flat_options``) are rebuilt. Any change can affect clones,
+    whose options are chained to their parents', so all snapshots go.
+    """
+    _generation[0] += 1
+
+
+sampler = Sampler()  # sampling state of call sites, shared by all Shows
+on_fork(sampler.reset)
+
 show = Show()
 
 # institute nice defaults
@@ -727,7 +1099,6 @@ class NoShow(Show):
     def __init__(self, **kwargs):
         self.options = NoShow.options.push(kwargs)
         self.say = SayReturn(silent=True, retvalue=False)
-        self.opts = None  # per call options, set on each call to reflect transient state
 
     def clone(self, **kwargs):
         """
@@ -745,7 +1116,7 @@ class NoShow(Show):
         return None
 
     __call__ = __gt__ = __rshift__ = _do_nothing
-    items = dir = props = locals = changed = inout = _do_nothing
+    items = dir = props = locals = changed = inout = summary = _do_nothing
     blank_lines = hr = title = _do_nothing
 
 noshow = NoShow()
@@ -0,0 +1,106 @@
+"""
+Deferred rendering. With the ``defer`` option, a show call only captures the
+names and values to be shown (a snapshot of each, as its type's copy policy
+dictates), and leaves formatting them--``repr``, highlighting, wrapping--to
+the writer thread of an ``AsyncSink``::
+
+    show.use_sink(defer=True)
+    show.copy_policy(MyRecord, 'deep')
+
+Values that are mutated after the call would otherwise be shown as they are
+when rendered, not as they were when shown. Copy policies:
+
+``'ref'``
+    hold a reference (immutable values, and the default for other types)
+``'shallow'``
+    ``copy.copy`` (the default for built-in mutable containers)
+``'deep'``
+    ``copy.deepcopy``
+
+A value that cannot be copied is held by reference.
+"""
+
+import copy
+from .util import _PY2
+
+POLICIES = ('ref', 'shallow', 'deep')
+
+# values of these types never need copying
+ATOMIC = (bool, int, float, complex, bytes, type(None)) + \
+         ((unicode, long) if _PY2 else (str,))
+
+_policies = {
+    list: 'shallow',
+    dict: 'shallow',
+    set: 'shallow',
+    bytearray: 'shallow',
+}
+_resolved = {}  # type => policy, as found along its MRO
+
+
+def copy_policy(cls, policy):
+    """
+    Set how values of type cls (and its subclasses) are captured for
+    deferred rendering: ``'ref'``, ``'shallow'``, or ``'deep'``.
+    """
+    if policy not in POLICIES:
+        raise ValueError('policy must be one of {0}, not {1!r}'.format(
+                         ', '.join(POLICIES), policy))
+    _policies[cls] = policy
+    _resolved.clear()
+
+
+def policy_for(cls):
+    """
+    Return the copy policy for type cls: that of the nearest class in its
+    MRO with a policy, else ``'ref'``.
+    """
+    try:
+        return _resolved[cls]
+    except KeyError:
+        pass
+    policy = 'ref'
+    for c in getattr(cls, '__mro__', (cls,)):
+        if c in _policies:
+            policy = _policies[c]
+            break
+    _resolved[cls] = policy
+    return policy
+
+
+def snapshot(value):
+    """
+    Capture value for later rendering, per its type's copy policy.
+    """
+    if isinstance(value, ATOMIC):
+        return value
+    policy = policy_for(type(value))
+    try:
+        if policy == 'shallow':
+            return copy.copy(value)
+        elif policy == 'deep':
+            return copy.deepcopy(value)
+    except Exception:
+        pass
+    return value
+
+
+class Deferred(object):
+    """
+    A show record, to be rendered to its output string when called. Renders
+    once, however many files it is written to. ``AsyncSink`` calls deferred
+    records on its writer thread; other files are written the rendered
+    string directly.
+    """
+
+    __slots__ = ('render', '_result')
+
+    def __init__(self, render):
+        self.render = render
+        self._result = None
+
+    def __call__(self):
+        if self._result is None:
+            self._result = self.render()
+            self.render = None  # let go of captured values
+        return self._result
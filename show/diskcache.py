@@ -0,0 +1,302 @@
+"""
+Optional on-disk stores of resolved call-site argument names: a cache that
+lets short-lived processes skip re-parsing source that an earlier process
+already parsed, and a prebuilt index for deployments that ship no source.
+"""
+
+import os
+import sys
+import json
+import atexit
+import hashlib
+import tempfile
+from codecs import open
+
+CACHE_DIR_ENV = 'SHOW_CACHE_DIR'
+INDEX_ENV = 'SHOW_INDEX'
+
+
+def _replace(src, dst):
+    """
+    Atomically move src over dst. ``os.replace`` where available, else
+    ``os.rename`` (which is atomic on POSIX, the primary target).
+    """
+    try:
+        os.replace(src, dst)
+    except AttributeError:          # pragma: no cover
+        os.rename(src, dst)
+
+
+class ArgCache(object):
+    """
+    Persistent store of argument names, keyed by source file path and line
+    number. Each source file gets one JSON record in the cache directory,
+    stamped with the source's modification time and size. If the stamp no
+    longer matches, the source has changed and the record is discarded.
+    New entries are held in memory and written by ``flush``, which is
+    called at process exit (including the exit of ``multiprocessing``
+    workers, which skip ``atexit`` handlers), so each file's record is
+    written once per process, not once per entry. Records are written to a
+    temporary file, then renamed into place, so concurrent processes never
+    see partial records. Writers merge in what is already on disk before
+    writing. If two writers still race, the last rename wins; the loser's
+    entries are re-derived on a later miss, so nothing is lost but a little
+    work.
+    """
+
+    def __init__(self, dirpath):
+        self.dirpath = dirpath
+        self._records = {}  # filepath => record, read or written this process
+        self._dirty = set()  # filepaths with entries not yet written
+        self._flushing = None  # pid of the process set to flush at exit
+
+    @classmethod
+    def from_environ(cls, environ=None):
+        """
+        Return an ``ArgCache`` rooted at ``$SHOW_CACHE_DIR``, or ``None`` if
+        that variable is not set.
+        """
+        environ = os.environ if environ is None else environ
+        dirpath = environ.get(CACHE_DIR_ENV)
+        return cls(dirpath) if dirpath else None
+
+    def get(self, filepath, lineno):
+        """
+        Return the cached argument names for the given call site, or ``None``
+        if not cached (or if the cached record is stale).
+        """
+        record = self._record(filepath)
+        if record is None:
+            return None
+        return record['lines'].get(str(lineno))
+
+    def put(self, filepath, lineno, args):
+        """
+        Record argument names for the given call site. They are seen at once
+        by this instance, but written to disk only by the next ``flush``.
+        """
+        record = self._record(filepath, create=True)
+        if record is None:
+            return
+        record['lines'][str(lineno)] = list(args)
+        self._dirty.add(filepath)
+        if self._flushing != os.getpid():
+            self._flush_at_exit()
+
+    def _flush_at_exit(self):
+        """
+        Arrange for ``flush`` to run as this process exits. ``multiprocessing``
+        workers exit without running ``atexit`` handlers, so have them
+        flush on the way out, too.
+        """
+        if self._flushing is None:
+            atexit.register(self.flush)     # inherited by forked children
+        self._flushing = os.getpid()
+        mp_util = sys.modules.get('multiprocessing.util')
+        if mp_util is not None:
+            mp_util.Finalize(None, self.flush, exitpriority=10)
+
+    def flush(self):
+        """
+        Write the records of files with new entries, each merged with
+        whatever other processes have recorded meanwhile. Failures to write
+        are silently ignored; the cache is purely an optimization.
+        """
+        dirty, self._dirty = self._dirty, set()
+        for filepath in dirty:
+            record = self._records.get(filepath)
+            if record is None:
+                continue
+            ondisk = self._read(filepath)
+            if ondisk is not None and ondisk['stamp'] == record['stamp']:
+                for k, v in ondisk['lines'].items():
+                    record['lines'].setdefault(k, v)
+            self._write(record)
+
+    def clear(self):
+        """
+        Forget everything, both in memory and on disk.
+        """
+        self._records.clear()
+        self._dirty.clear()
+        try:
+            names = os.listdir(self.dirpath)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith('.json'):
+                try:
+                    os.remove(os.path.join(self.dirpath, name))
+                except OSError:
+                    pass
+
+    def _stamp(self, filepath):
+        """
+        Return a [mtime, size] validity stamp for filepath, or ``None`` if
+        it is not a real file (e.g. ``<stdin>``).
+        """
+        try:
+            st = os.stat(filepath)
+        except (OSError, TypeError, ValueError):
+            return None
+        mtime = getattr(st, 'st_mtime_ns', None) or st.st_mtime
+        return [mtime, st.st_size]
+
+    def _path(self, filepath):
+        """
+        Return the location of the cache record for filepath.
+        """
+        key = os.path.abspath(filepath).encode('utf-8')
+        return os.path.join(self.dirpath, hashlib.sha1(key).hexdigest() + '.json')
+
+    def _record(self, filepath, create=False):
+        """
+        Return the current record for filepath, reloading it from disk if our
+        in-memory copy is absent or stale. If ``create``, start a new record
+        when none is usable; else return ``None``.
+        """
+        stamp = self._stamp(filepath)
+        if stamp is None:
+            return None
+        record = self._records.get(filepath)
+        if record is None or record['stamp'] != stamp:
+            record = self._read(filepath)
+            if record is None or record['stamp'] != stamp:
+                if not create:
+                    return None
+                record = {'path': filepath, 'stamp': stamp, 'lines': {}}
+            self._records[filepath] = record
+        return record
+
+    def _read(self, filepath):
+        """
+        Read the on-disk record for filepath, if there is a sound one.
+        """
+        try:
+            with open(self._path(filepath), 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        if not isinstance(record, dict) or record.get('path') != filepath:
+            return None
+        return record
+
+    def _write(self, record):
+        """
+        Write a record atomically: first to a private temporary file, then
+        renamed over the old record.
+        """
+        try:
+            if not os.path.isdir(self.dirpath):
+                os.makedirs(self.dirpath)
+            fd, tmppath = tempfile.mkstemp(dir=self.dirpath, prefix='.tmp-')
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(record, f)
+            _replace(tmppath, self._path(record['path']))
+        except (IOError, OSError, TypeError, ValueError):
+            try:
+                os.remove(tmppath)
+            except OSError:
+                pass
+
+
+def source_stamp(source):
+    """
+    Return a [size, SHA-1 hex digest] stamp identifying source (bytes).
+    """
+    return [len(source), hashlib.sha1(source).hexdigest()]
+
+
+class SidecarIndex(object):
+    """
+    Prebuilt call-site index, as written by ``python -m show index``. Maps
+    source paths, relative to the directories indexed, to argument names by
+    line. A frame's filename is matched against those paths by its longest
+    matching tail, so the index works wherever the code is later installed.
+    Meant for deployments with no source at run time (only ``.pyc`` files,
+    or zipapps), where names could otherwise not be found at all. Where the
+    source is present, an entry is used only if the source is unchanged
+    since it was indexed (by size and hash). Where it is not, the matching
+    tail must include a directory (``pkg/mod.py``, not just ``mod.py``), so
+    that top-level modules do not lend their names to unrelated files of
+    the same name. Index files are loaded at first use.
+    """
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        self._files = None      # relpath => { lineno: names }
+        self._stamps = None     # relpath => source stamp, when indexed
+        self._found = {}        # filepath => entry (or None), as looked up
+
+    @classmethod
+    def from_environ(cls, environ=None):
+        """
+        Return a ``SidecarIndex`` of the index files named in ``$SHOW_INDEX``
+        (separated by ``os.pathsep``), or ``None`` if that is not set.
+        """
+        environ = os.environ if environ is None else environ
+        paths = [p for p in environ.get(INDEX_ENV, '').split(os.pathsep) if p]
+        return cls(paths) if paths else None
+
+    def get(self, filepath, lineno):
+        """
+        Return the indexed argument names for the given call site, or
+        ``None`` if it is not indexed.
+        """
+        try:
+            entry = self._found[filepath]
+        except KeyError:
+            entry = self._found[filepath] = self._lookup(filepath)
+        if entry is None:
+            return None
+        return entry.get(str(lineno))
+
+    def _lookup(self, filepath):
+        """
+        Find the entry whose path is the longest tail of filepath, if it
+        may be used for filepath.
+        """
+        if self._files is None:
+            self._load()
+        parts = filepath.replace('\\', '/').split('/')
+        for i in range(len(parts)):
+            relpath = '/'.join(parts[i:])
+            entry = self._files.get(relpath)
+            if entry is not None:
+                return entry if self._usable(filepath, relpath) else None
+        return None
+
+    def _usable(self, filepath, relpath):
+        """
+        May the entry for relpath be used for filepath? If filepath can be
+        read, only if it is the source indexed. If not, only if relpath
+        names a directory as well as a file.
+        """
+        try:
+            if os.path.isfile(filepath):
+                stamp = self._stamps.get(relpath)
+                if stamp is None or os.path.getsize(filepath) != stamp[0]:
+                    return False
+                with open(filepath, 'rb') as f:
+                    return source_stamp(f.read()) == stamp
+        except (IOError, OSError, TypeError, ValueError):
+            pass
+        return '/' in relpath
+
+    def _load(self):
+        """
+        Read and merge the index files. Unreadable ones are skipped.
+        """
+        files, stamps = {}, {}
+        for path in self.paths:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                files.update(index['files'])
+                stamps.update(index.get('stamps', {}))
+            except (IOError, OSError, ValueError, KeyError, TypeError, AttributeError):
+                pass
+        self._files, self._stamps = files, stamps
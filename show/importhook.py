@@ -0,0 +1,301 @@
+"""
+Import hook that rewrites ``show`` calls as modules are imported. The argument
+names of each call are worked out once, at import time, and passed to the
+call directly, so at run time there is no source lookup or parsing to do.
+
+    import show.importhook
+    show.importhook.install('mypackage')
+    import mypackage   # show calls within are now precompiled
+
+For production, ``show.importhook.strip('mypackage')`` instead compiles show
+calls out of the package altogether. Either can be switched on with
+environment variables naming the packages (comma- or space-separated), and
+the program run by ``python -m show run``, which installs the hooks before
+any of the program is imported::
+
+    SHOW_STRIP=mypackage,otherpackage python -m show run -m mypackage.app
+    SHOW_PRECOMPILE=myscript python -m show run myscript.py arg1 arg2
+
+Importing ``show`` also installs hooks named in those variables, but only
+modules imported after that are rewritten--not the module that first
+imports ``show``, nor a package's ``__init__`` that does. Alternatively,
+call ``install_from_environ()`` from ``sitecustomize``. Python 3 only.
+"""
+
+import os
+import sys
+import ast
+import types
+import runpy
+
+if sys.version_info[0] < 3:  # pragma: no cover
+    raise ImportError('show.importhook requires Python 3')
+
+from importlib.machinery import PathFinder, SourceFileLoader
+from .introspect import CallArgs, SourceText, arg_source, call_name, clone_names
+from .introspect import operand_name
+from .util import words
+
+
+# Suffixes of the show methods that label their output with argument names
+NAMED_SUFFIXES = ('', '.items', '.props', '.dir', '.where', '.changed',
+                  '.summary')
+
+# Suffixes of the show methods that only produce output, and so can be
+# compiled out (not ``.inout``, which returns a wrapped function)
+STRIPPED_SUFFIXES = NAMED_SUFFIXES + ('.locals', '.args', '.pprint', '.sep',
+                                      '.title', '.hr', '.blank_lines')
+
+
+def const(value):
+    """
+    Return an AST node for a string or ``None`` constant, in the form the
+    running Python version expects.
+    """
+    if sys.version_info >= (3, 8):
+        return ast.Constant(value=value)
+    elif value is None:
+        return ast.NameConstant(value=value)
+    else:
+        return ast.Str(s=value)
+
+
+class ShowTransformer(ast.NodeTransformer):
+    """
+    Base for transformers of ``show`` calls. Determines the target names for
+    a module: those registered with ``CallArgs.add_target_func`` (including
+    prior clones) plus any clones assigned within the module itself, which
+    will not be registered until the module runs. Given the module's
+    ``source``, names are sliced from it exactly as written.
+    """
+
+    suffixes = NAMED_SUFFIXES
+
+    def __init__(self, bases=None, source=None):
+        self.bases = set(CallArgs.TARGET_BASES if bases is None else bases)
+        self.targets = set()
+        self.text = SourceText(source) if source is not None else None
+
+    def visit_Module(self, node):
+        self.bases.update(clone_names(node, self.bases))
+        self.targets = set(b + s for b in self.bases for s in self.suffixes)
+        self.generic_visit(node)
+        return node
+
+
+class NamingTransformer(ShowTransformer):
+    """
+    Rewrites ``show(x, y)`` as ``show(x, y, _argnames=('x', 'y'))``, and
+    likewise for clones and for the show methods that label their arguments.
+    Calls with ``*args`` are left alone, to be introspected as usual.
+    """
+
+    def visit_Call(self, node):
+        names = None
+        if call_name(node) in self.targets and self._nameable(node):
+            names = [arg_source(arg, self.text) for arg in node.args]
+        self.generic_visit(node)
+        if names is not None:
+            argnames = ast.Tuple(elts=[const(n) for n in names], ctx=ast.Load())
+            node.keywords.append(ast.keyword(arg='_argnames', value=argnames))
+        return node
+
+    def _nameable(self, node):
+        """
+        Can the names of this call's arguments be known statically?
+        """
+        starred = getattr(ast, 'Starred', ())
+        if any(isinstance(arg, starred) for arg in node.args):
+            return False
+        if getattr(node, 'starargs', None):
+            return False
+        return not any(kw.arg == '_argnames' for kw in node.keywords)
+
+
+class StrippingTransformer(ShowTransformer):
+    """
+    Compiles ``show`` calls (and the ``show > x`` and ``show >> x`` forms)
+    out entirely. Those made as statements (a ``show(x)`` line of its own)
+    become ``pass``; those used as values become ``None``, which is what a
+    silenced show returns. Their arguments are never evaluated. Decorators
+    (e.g. ``@show.inout``) are left alone.
+    """
+
+    suffixes = STRIPPED_SUFFIXES
+
+    def _is_show(self, node):
+        """
+        Is node a show call, or a ``show > x`` or ``show >> x`` expression?
+        """
+        if isinstance(node, ast.Call):
+            return call_name(node) in self.targets
+        if isinstance(node, ast.Compare):
+            return len(node.ops) == 1 and isinstance(node.ops[0], ast.Gt) and \
+                operand_name(node.left) in self.targets
+        if isinstance(node, ast.BinOp):
+            return isinstance(node.op, ast.RShift) and \
+                operand_name(node.left) in self.targets
+        return False
+
+    def visit_Expr(self, node):
+        if self._is_show(node.value):
+            return ast.copy_location(ast.Pass(), node)
+        self.generic_visit(node)
+        return node
+
+    def _visit_expression(self, node):
+        if self._is_show(node):
+            return ast.copy_location(const(None), node)
+        self.generic_visit(node)
+        return node
+
+    visit_Call = visit_Compare = visit_BinOp = _visit_expression
+
+    def _visit_decorated(self, node):
+        decorators, node.decorator_list = node.decorator_list, []
+        self.generic_visit(node)
+        node.decorator_list = decorators
+        return node
+
+    visit_FunctionDef = visit_AsyncFunctionDef = visit_ClassDef = _visit_decorated
+
+
+class ShowLoader(SourceFileLoader):
+    """
+    Source loader that passes each module's AST through a transformer before
+    compiling it. Bytecode is neither read from nor written to ``__pycache__``,
+    so rewritten code is never confused with the plainly compiled module.
+    """
+
+    def __init__(self, fullname, path, transformer):
+        SourceFileLoader.__init__(self, fullname, path)
+        self.transformer = transformer
+
+    def get_code(self, fullname):
+        source = self.get_data(self.path)
+        tree = ast.parse(source, self.path)
+        tree = ast.fix_missing_locations(self.transformer(source=source).visit(tree))
+        return compile(tree, self.path, 'exec', dont_inherit=True)
+
+
+class ShowFinder(object):
+    """
+    ``sys.meta_path`` finder that routes the chosen packages or modules (and
+    their submodules) through a ``ShowLoader``.
+    """
+
+    def __init__(self, packages, transformer):
+        self.packages = tuple(packages)
+        self.transformer = transformer
+
+    def handles(self, fullname):
+        """
+        Is the named module one whose show calls we should rewrite?
+        """
+        return any(fullname == p or fullname.startswith(p + '.')
+                   for p in self.packages)
+
+    def find_spec(self, fullname, path=None, target=None):
+        if not self.handles(fullname):
+            return None
+        spec = PathFinder.find_spec(fullname, path)
+        if spec is None or not isinstance(spec.loader, SourceFileLoader):
+            return None
+        spec.loader = ShowLoader(fullname, spec.origin, self.transformer)
+        return spec
+
+    def invalidate_caches(self):
+        pass
+
+
+def install(*packages):
+    """
+    Rewrite ``show`` calls in the given packages or modules, and their
+    submodules, as they are imported. Modules already imported are not
+    affected. Returns the installed finder.
+    """
+    finder = ShowFinder(packages, NamingTransformer)
+    sys.meta_path.insert(0, finder)
+    return finder
+
+
+def strip(*packages):
+    """
+    Compile ``show`` calls out of the given packages or modules, and their
+    submodules, as they are imported, so that they cost nothing at all.
+    Modules already imported are not affected. Returns the installed finder.
+    """
+    finder = ShowFinder(packages, StrippingTransformer)
+    sys.meta_path.insert(0, finder)
+    return finder
+
+
+def install_from_environ(environ=None):
+    """
+    Install hooks for the packages named in ``$SHOW_STRIP`` and
+    ``$SHOW_PRECOMPILE``. Stripping takes precedence for packages named in
+    both. Returns a list of the finders installed.
+    """
+    environ = os.environ if environ is None else environ
+    finders = []
+    precompiled = words(environ.get('SHOW_PRECOMPILE', ''))
+    if precompiled:
+        finders.append(install(*precompiled))
+    stripped = words(environ.get('SHOW_STRIP', ''))
+    if stripped:
+        finders.append(strip(*stripped))
+    return finders
+
+
+def run(argv):
+    """
+    Run a program as ``python`` would, given ``-m module`` or a script path
+    and their arguments in argv, with the import hooks named by
+    ``$SHOW_STRIP`` and ``$SHOW_PRECOMPILE`` installed first, so that they
+    apply to every module the program imports--and to the script itself,
+    if it is named (by its file name, less ``.py``). The command line
+    ``python -m show run ...`` calls this.
+    """
+    if not any(isinstance(f, ShowFinder) for f in sys.meta_path):
+        install_from_environ()      # unless importing show just did
+    if argv[:1] == ['-m'] and len(argv) > 1:
+        sys.argv = argv[1:]
+        runpy.run_module(argv[1], run_name='__main__', alter_sys=True)
+    elif argv and not argv[0].startswith('-'):
+        sys.argv = list(argv)
+        _run_script(argv[0])
+    else:
+        raise SystemExit('usage: python -m show run (-m module | script) [args ...]')
+
+
+def _run_script(path):
+    """
+    Run the script at path as ``__main__``, rewritten by whichever hook
+    handles its name.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    with open(path, 'rb') as f:
+        source = f.read()
+    tree = ast.parse(source, path)
+    for finder in sys.meta_path:
+        if isinstance(finder, ShowFinder) and finder.handles(name):
+            tree = finder.transformer(source=source).visit(tree)
+            tree = ast.fix_missing_locations(tree)
+            break
+    code = compile(tree, path, 'exec', dont_inherit=True)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(path)))
+    main = types.ModuleType('__main__')
+    main.__file__ = path
+    main.__builtins__ = __builtins__
+    sys.modules['__main__'] = main
+    exec(code, main.__dict__)
+
+
+def uninstall(finder=None):
+    """
+    Remove the given finder--or if none given, all show import hooks--from
+    ``sys.meta_path``.
+    """
+    sys.meta_path[:] = [f for f in sys.meta_path
+                        if not (f is finder or
+                                (finder is None and isinstance(f, ShowFinder)))]
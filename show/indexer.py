@@ -0,0 +1,139 @@
+"""
+Ahead-of-time indexer of ``show`` call sites. Walks source trees, finds every
+call site (including those of clones), and writes a sidecar index that
+``CallArgs`` can use where no source is available at run time::
+
+    python -m show index src -o show_index.json
+    SHOW_INDEX=show_index.json python app.pyz
+
+Index the directories that will be on ``sys.path`` (e.g. ``src`` or
+``site-packages``), so that indexed paths line up with module paths.
+"""
+
+import os
+import sys
+import ast
+import json
+import argparse
+import tempfile
+import multiprocessing
+from .introspect import CallArgs, CallIndex, clone_names
+from .diskcache import _replace, source_stamp
+
+
+def source_files(paths):
+    """
+    Yield (filepath, relpath) for every Python source file in the given
+    paths. Directories are walked; relpaths are relative to the directory
+    given, or just the file name for files given directly.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames[:] = sorted(d for d in dirnames
+                                     if not d.startswith('.') and d != '__pycache__')
+                for filename in sorted(filenames):
+                    if filename.endswith('.py'):
+                        filepath = os.path.join(dirpath, filename)
+                        relpath = os.path.relpath(filepath, path)
+                        yield filepath, relpath.replace(os.sep, '/')
+        elif path.endswith('.py'):
+            yield path, os.path.basename(path)
+
+
+def index_file(job):
+    """
+    Index one source file. ``job`` is a (filepath, relpath, base names)
+    tuple; returns (relpath, { lineno: names }, stamp), with line numbers as
+    strings for JSON's sake, plus { 'lineno:col': [call name, names] } for
+    each call, for lookups by exact call position (see ``position_args``).
+    The stamp identifies the source indexed. Unparseable files yield an
+    empty mapping.
+    """
+    filepath, relpath, bases = job
+    try:
+        with open(filepath, 'rb') as f:
+            source = f.read()
+        tree = ast.parse(source, filepath)
+    except (IOError, OSError, SyntaxError, ValueError, TypeError):
+        return relpath, {}, None
+    bases = set(bases) | clone_names(tree, bases)
+    targets = set(b + s for b in bases for s in CallArgs.SUFFIXES)
+    index = CallIndex(filepath, source=source, targets=targets)
+    entries = dict((str(k), v) for k, v in index.lines.items())
+    entries.update(index.positions)
+    return relpath, entries, source_stamp(source)
+
+
+def build_index(paths, names=(), jobs=None):
+    """
+    Index the source files found in paths, using a pool of ``jobs`` worker
+    processes (default: one per CPU). ``names`` are target names in
+    addition to those already registered (e.g. ``show``). Returns the
+    index as a dict, ready to be written as JSON.
+    """
+    bases = sorted(set(CallArgs.TARGET_BASES) | set(names))
+    work = [(filepath, relpath, bases) for filepath, relpath in source_files(paths)]
+    if jobs == 1 or len(work) < 2:
+        results = map(index_file, work)
+        return _assemble(results)
+    pool = multiprocessing.Pool(jobs)
+    try:
+        return _assemble(pool.imap_unordered(index_file, work, chunksize=8))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _assemble(results):
+    """
+    Gather per-file results into an index, omitting files with no calls.
+    """
+    files, stamps = {}, {}
+    for relpath, lines, stamp in results:
+        if lines:
+            files[relpath], stamps[relpath] = lines, stamp
+    return {'version': 2, 'files': files, 'stamps': stamps}
+
+
+def write_index(index, filepath):
+    """
+    Write the index as JSON, atomically.
+    """
+    dirpath = os.path.dirname(os.path.abspath(filepath))
+    fd, tmppath = tempfile.mkstemp(dir=dirpath, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(index, f, sort_keys=True)
+        _replace(tmppath, filepath)
+    except Exception:
+        os.remove(tmppath)
+        raise
+
+
+def main(argv=None):
+    """
+    Command line entry point, for ``python -m show``.
+    """
+    parser = argparse.ArgumentParser(prog='python -m show')
+    commands = parser.add_subparsers(dest='command')
+    cmd = commands.add_parser('index', help='index show call sites ahead of time')
+    cmd.add_argument('paths', nargs='+', help='source directories or files')
+    cmd.add_argument('-o', '--output', default='show_index.json',
+                     help='index file to write (default: %(default)s)')
+    cmd.add_argument('-j', '--jobs', type=int, default=None,
+                     help='worker processes (default: one per CPU)')
+    cmd.add_argument('-n', '--name', action='append', default=[],
+                     help='additional show-like name to index (repeatable)')
+    args = parser.parse_args(argv)
+    if args.command != 'index':
+        parser.print_help()
+        return 2
+
+    index = build_index(args.paths, names=args.name, jobs=args.jobs)
+    write_index(index, args.output)
+    nsites = sum(1 for lines in index['files'].values()
+                 for key in lines if ':' not in key)
+    sys.stderr.write('indexed {0} call site lines in {1} files to {2}\n'.format(
+                     nsites, len(index['files']), args.output))
+    return 0
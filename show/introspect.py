@@ -4,14 +4,24 @@ Home module for inspect/introspection based activities and helpers.
 
 import inspect
 import ast
-from .astor import to_source as astor_to_source
-from mementos import mementos, with_metaclass, MementoMetaclass
+import sys
+try:
+    from .astor import to_source as astor_to_source
+except SyntaxError:  # pragma: no cover
+    # vendored astor uses ``async`` as a name, a keyword since Python 3.7
+    astor_to_source = None
+from mementos import with_metaclass
 from nulltype import NullType
 from .linecacher import *
+from .diskcache import ArgCache, SidecarIndex
+from .cache import BoundedCache, MemoMetaclass
+from .repr import _dispatch
+from .exceptions import ArgsUnavailable, ParseError
 from .util import words
 from .util import _PY2
 import textwrap
 import unicodedata
+from itertools import islice
 
 
 class DotDict(dict):
@@ -29,7 +39,7 @@ DEBUGGING = False
 # eg.
 
 
-class ClassProps(mementos):
+class ClassProps(with_metaclass(MemoMetaclass, object)):
     """
     Memoized finder of class props.
     """
@@ -144,27 +154,147 @@ def object_props(o):
 
 def to_source(node):
     """
-    Convert the given AST node back to Python source code.
+    Convert the given AST node back to Python source code. Uses
+    ``ast.unparse`` where available (Python 3.9+), else astor. Regenerated
+    source may be spelled differently than the original (spacing, parens),
+    so ``arg_source`` is preferred where the original text is at hand.
     """
-    return astor_to_source(node).strip()
+    if _unparse is not None:
+        return _unparse(node).strip()
+    if astor_to_source is not None:
+        return astor_to_source(node).strip()
+    return '?'  # pragma: no cover
 
-    if False: # pragma: no cover
-        source = astor.to_source(node)
 
-        # astor.to_source loves to wrap expressions in parenthesis, leading to
-        # a mis-match with what seen in the input. This tries to reverse those
-        # extra parens.
-        if isinstance(node, ast.Module) and hasattr(node, 'body') and \
-           len(node.body) == 1 and isinstance(node.body[0], ast.Expr):
-            node = node.body[0]
-        if isinstance(node, (ast.Expr, ast.BinOp, ast.UnaryOp)) and source.startswith('(') and \
-            source.endswith(')'):
-            source = source[1:-1]
-        return source
+_unparse = getattr(ast, 'unparse', None)
+
+# Python 3.8+ AST nodes record where they end, as well as where they start
+HAS_END_POSITIONS = sys.version_info >= (3, 8)
+
+
+class SourceText(object):
+    """
+    Source code, as given to ``ast.parse``, from which the original text of
+    its AST nodes can be sliced. Node column offsets count UTF-8 bytes, not
+    characters, so lines are kept UTF-8 encoded. Split into lines once, so
+    slicing many nodes out of one file is cheap.
+    """
+
+    def __init__(self, source):
+        self.lines = None
+        if not HAS_END_POSITIONS or not source:
+            return
+        if isinstance(source, bytes):
+            try:
+                source = _decode_source(source)
+            except (SyntaxError, UnicodeDecodeError, LookupError):
+                return
+        # bytes.splitlines breaks at the same \n, \r\n, \r as the parser
+        self.lines = source.encode('utf-8').splitlines()
+
+    def segment(self, node):
+        """
+        Return the original source text of node, or ``None`` if it cannot be
+        sliced out exactly: before Python 3.8, or if node spans lines (whose
+        text would make an awkward one-line label).
+        """
+        if self.lines is None:
+            return None
+        lineno = getattr(node, 'lineno', None)
+        if lineno is None or lineno != getattr(node, 'end_lineno', None):
+            return None
+        col, end_col = node.col_offset, node.end_col_offset
+        if end_col is None or not 0 < lineno <= len(self.lines):
+            return None
+        try:
+            return self.lines[lineno - 1][col:end_col].decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+
+
+def _decode_source(source):
+    """
+    Decode source bytes as Python would, honoring any coding declaration.
+    """
+    from importlib.util import decode_source
+    return decode_source(source)
+
+
+def arg_source(node, text=None):
+    """
+    Return the source of an argument node: exactly as written if ``text``
+    (a ``SourceText`` of the source that node was parsed from) can supply
+    it, else regenerated from the AST.
+    """
+    if text is not None:
+        segment = text.segment(node)
+        if segment is not None:
+            return segment
+    return to_source(node)
+
+
+def call_name(n):
+    """
+    Given an ``ast.Call`` node n which we suspect might represent a call of a
+    target callable (e.g. ``show`` or one of its attribute-define subcalls such
+    as ``show.props``), return the name of the called function, if
+    discoverable. If not one of the simple forms we typically see, return
+    ``None``.
+    """
+    if isinstance(n.func, ast.Name):
+        return n.func.id
+    elif isinstance(n.func, ast.Attribute):
+        a = n.func
+        if isinstance(a.value, ast.Name):
+            return '.'.join([a.value.id, a.attr])
+        else:
+            # could be an attribute of a call, but for those, we don't
+            # much care
+            return None
+    else:
+        return None
+
+
+def operand_name(n):
+    """
+    Like ``call_name``, but for the left operand of ``show > x`` and
+    ``show >> x`` forms, which is a bare name or attribute, not a call.
+    """
+    if isinstance(n, ast.Name):
+        return n.id
+    elif isinstance(n, ast.Attribute) and isinstance(n.value, ast.Name):
+        return '.'.join([n.value.id, n.attr])
+    else:
+        return None
+
+
+def clone_names(tree, bases):
+    """
+    Find the names assigned clones (e.g. ``dbg = show.clone()``) of the
+    given base names within an AST, including clones of those clones.
+    Returns the set of new names. Clones are normally registered as they are
+    made, at run time; this finds them ahead of time.
+    """
+    def clones_base(value):
+        return isinstance(value, ast.Call) and \
+               isinstance(value.func, ast.Attribute) and \
+               value.func.attr == 'clone' and \
+               operand_name(value.func.value) in known
+
+    known = set(bases)
+    assigns = [n for n in ast.walk(tree) if isinstance(n, ast.Assign)]
+    found = True
+    while found:
+        found = False
+        for n in assigns:
+            if clones_base(n.value):
+                for target in n.targets:
+                    name = operand_name(target)
+                    if name and name not in known:
+                        known.add(name)
+                        found = True
+    return known - set(bases)
 
-    # TODO: More robust mapping of source string to source here. Possibly using
-    # original string, but with AST parsing used as guideline to where that string
-    # starts and stops.
 
 class Arg(object):
     def __init__(self, name, value=None, hint=None):
@@ -179,7 +309,7 @@ class Arg(object):
 # TODO: should hints also go to transformers?
 
 
-class CallArgs(with_metaclass(MementoMetaclass, ast.NodeVisitor)):
+class CallArgs(with_metaclass(MemoMetaclass, ast.NodeVisitor)):
     """
     An ``ast.NodeVisitor`` that parses a Python function call and determines its
     arguments from the corresponding AST. Memoized so that parsing and
@@ -188,6 +318,15 @@ class CallArgs(with_metaclass(MementoMetaclass, ast.NodeVisitor)):
     """
 
     TARGET_FUNCS = set()  # function names we care about
+    TARGET_BASES = set()  # base names (e.g. 'show') from which those derive
+    SUFFIXES = [''] + words("""
+        .items .props .where .changed .dir .chars .local .watched .inout
+        .summary
+        .sep .title .hr .blank_lines
+    """)
+
+    disk_cache = ArgCache.from_environ()  # optional persistent ArgCache
+    sidecar = SidecarIndex.from_environ()  # optional prebuilt SidecarIndex
 
     @classmethod
     def add_target_func(cls, name):
@@ -196,15 +335,11 @@ class CallArgs(with_metaclass(MementoMetaclass, ast.NodeVisitor)):
         to consider. E.g. 'show', 'show.items', 'show.dir' and so on.
         This function adds those names for a given base name.
         """
-        suffixes = words("""
-            .items .props .where .changed .dir .chars .local .watched .inout
-            .sep .title .hr .blank_lines
-        """)
-        suffixes.insert(0, '')
         name = name.decode() if _PY2 else name
         normal_name = unicodedata.normalize('NFKC', name) # in case contains Unicode
-        names = [normal_name + s for s in suffixes]
+        names = [normal_name + s for s in cls.SUFFIXES]
         cls.TARGET_FUNCS.update(names)
+        cls.TARGET_BASES.add(normal_name)
 
     # TODO: Can this list of methods be auto-generated with inspection?
 
@@ -216,10 +351,22 @@ class CallArgs(with_metaclass(MementoMetaclass, ast.NodeVisitor)):
         self.filepath = filepath
         self.lineno   = lineno
         self.source   = Placeholder
+        self.text     = None
         self.ast      = Placeholder
         self.args     = Placeholder
-        self.get_ast()
-        self.visit(self.ast)
+        args = self.stored(filepath, lineno)
+        if args is not None:
+            self.args = args
+            return
+        cache = self.disk_cache
+        args = CallIndex.for_file(filepath).get(lineno)
+        if args is not None:
+            self.args = args
+        else:
+            self.get_ast()
+            self.visit(self.ast)
+        if cache is not None and self.args is not Placeholder:
+            cache.put(filepath, lineno, self.args)
 
     def get_ast(self):
         """
@@ -236,6 +383,7 @@ class CallArgs(with_metaclass(MementoMetaclass, ast.NodeVisitor)):
                 srcleft = textwrap.dedent(src)
                 self.ast = ast.parse(srcleft)
                 self.source = src
+                self.text = SourceText(srcleft)
                 return
             except IndentationError:
                 pass
@@ -243,6 +391,44 @@ class CallArgs(with_metaclass(MementoMetaclass, ast.NodeVisitor)):
                 pass
         raise ParseError('Failed to parse source:\n{src}\n')
 
+    @classmethod
+    def use_disk_cache(cls, dirpath):
+        """
+        Persist resolved argument names under the given directory, so that
+        later processes can skip parsing. ``None`` turns the disk cache off.
+        Also enabled at startup by setting ``$SHOW_CACHE_DIR``. Entries not
+        yet written by the cache being replaced are written first.
+        """
+        if cls.disk_cache is not None:
+            cls.disk_cache.flush()
+        cls.disk_cache = ArgCache(dirpath) if dirpath else None
+
+    @classmethod
+    def use_index(cls, *paths):
+        """
+        Look up argument names first in the given prebuilt index files, as
+        written by ``python -m show index``. No paths turns indexes off.
+        Also enabled at startup by setting ``$SHOW_INDEX``. Argument names
+        already found are forgotten, to be looked up anew.
+        """
+        cls.sidecar = SidecarIndex(paths) if paths else None
+        cls.memo.clear()
+        _position_cache.clear()
+
+    @classmethod
+    def stored(cls, filepath, key):
+        """
+        Return what the sidecar index, else the disk cache, has stored for
+        the call site at key (a line number, or a ``'line:column'`` call
+        position) in filepath, or ``None`` if neither has it.
+        """
+        for store in (cls.sidecar, cls.disk_cache):
+            if store is not None:
+                found = store.get(filepath, key)
+                if found is not None:
+                    return found
+        return None
+
     def visit_Call(self, node):
         """
         Called for all ``ast.Call`` nodes. Collects source of each argument.
@@ -253,29 +439,9 @@ class CallArgs(with_metaclass(MementoMetaclass, ast.NodeVisitor)):
         pragmas, not data.
         """
 
-        def call_name(n):
-            """
-            Given an AST node n which we suspect might represent the name of a target
-            callable (e.g. ``show`` or one of its attribute-define subcalls such as
-            ``show.props``), return the name of the called function, if discoverable. If
-            not one of the simple forms we typically see, return ``None``.
-            """
-            if isinstance(n.func, ast.Name):
-                return n.func.id
-            elif isinstance(n.func, ast.Attribute):
-                a = n.func
-                if isinstance(a.value, ast.Name):
-                    return '.'.join([a.value.id, a.attr])
-                else:
-                    # could be an attribute of a call, but for those, we don't
-                    # much care
-                    return None
-            else:
-                return None
-
         name = call_name(node)
         if name in self.TARGET_FUNCS:
-            self.args = [to_source(arg) for arg in node.args]
+            self.args = [arg_source(arg, self.text) for arg in node.args]
         else:
             # visit the children
             ast.NodeVisitor.generic_visit(self, node)
@@ -312,7 +478,7 @@ class CallArgs(with_metaclass(MementoMetaclass, ast.NodeVisitor)):
             left, right = node.left, node.comparators[0]
             name = call_name_for_compare(left)
             if name in self.TARGET_FUNCS:
-                self.args = [to_source(right)]
+                self.args = [arg_source(right, self.text)]
             else:
                 # visit its children
                 ast.NodeVisitor.generic_visit(self, left)
@@ -349,7 +515,7 @@ class CallArgs(with_metaclass(MementoMetaclass, ast.NodeVisitor)):
             left, right = node.left, node.right
             name = call_name_for_binop(left)
             if name in self.TARGET_FUNCS:
-                self.args = [to_source(right)]
+                self.args = [arg_source(right, self.text)]
             else:
                 # visit its children
                 ast.NodeVisitor.generic_visit(self, left)
@@ -362,3 +528,247 @@ class CallArgs(with_metaclass(MementoMetaclass, ast.NodeVisitor)):
         ast.NodeVisitor.generic_visit(self, node.test)
         # Previously did not need this generic visit for assert statements,
         # but at some point, tests started failing unless it was here.
+
+
+class CallIndex(ast.NodeVisitor):
+    """
+    Index of the target calls in one source file (or IPython cell), by line
+    number. The file is parsed and walked once; thereafter, finding the
+    argument names for a call site is a dict lookup. Each call is indexed
+    under every line it spans (since the line a frame reports for a
+    multi-line call varies by Python version), with the line it starts on
+    taking precedence. Rebuilt if more target names are added (e.g. when
+    ``show`` is cloned).
+    """
+
+    _indexes = BoundedCache()  # filepath => CallIndex
+
+    @classmethod
+    def for_file(cls, filepath):
+        """
+        Return the current index for the given file, building it if needed.
+        """
+        index = cls._indexes.get(filepath)
+        if index is None or index.ntargets != len(CallArgs.TARGET_FUNCS):
+            index = cls(filepath)
+            cls._indexes.put(filepath, index)
+        return index
+
+    def __init__(self, filepath, source=None, targets=None):
+        """
+        Index the given file. Its source is fetched with ``getlines`` unless
+        given; the target names are ``CallArgs.TARGET_FUNCS`` unless given.
+        """
+        ast.NodeVisitor.__init__(self)
+        self.filepath = filepath
+        self.targets  = CallArgs.TARGET_FUNCS if targets is None else targets
+        self.ntargets = len(self.targets)
+        self.lines = {}         # lineno => args of call starting there
+        self.positions = {}     # 'lineno:col' => [name, args] of call there
+        self._spanned = {}      # lineno => args of call spanning it
+        self._stmt = None       # innermost enclosing statement
+        if source is None:
+            lines = getlines(filepath)
+            source = ''.join(lines) if lines else None
+        if not source:
+            return
+        try:
+            tree = ast.parse(source)
+        except (SyntaxError, ValueError, TypeError):
+            return
+        self._text = SourceText(source)
+        self.visit(tree)
+        for lineno, args in self._spanned.items():
+            self.lines.setdefault(lineno, args)
+        del self._spanned, self._text
+
+    def get(self, lineno):
+        """
+        Return the argument names of the target call at lineno, or ``None``
+        if no such call is known.
+        """
+        return self.lines.get(lineno)
+
+    def _record(self, node, args):
+        """
+        Note the args for a target call found at the given node.
+        """
+        self.lines[node.lineno] = args
+        end_lineno = getattr(node, 'end_lineno', None)
+        if end_lineno is None:
+            end_lineno = max(getattr(n, 'lineno', node.lineno) for n in ast.walk(node))
+        first_lineno = min(node.lineno, self._stmt.lineno) if self._stmt else node.lineno
+        for lineno in range(first_lineno, end_lineno + 1):
+            self._spanned.setdefault(lineno, args)
+
+    def generic_visit(self, node):
+        if isinstance(node, ast.stmt):
+            outer, self._stmt = self._stmt, node
+            ast.NodeVisitor.generic_visit(self, node)
+            self._stmt = outer
+        else:
+            ast.NodeVisitor.generic_visit(self, node)
+
+    def visit_Call(self, node):
+        name = call_name(node)
+        if name in self.targets:
+            args = [arg_source(arg, self._text) for arg in node.args]
+            self._record(node, args)
+            self.positions[position_key(node.lineno, node.col_offset)] = [name, args]
+        else:
+            self.generic_visit(node)
+
+    def visit_Compare(self, node):
+        if isinstance(node.ops[0], ast.Gt) and \
+           operand_name(node.left) in self.targets:
+            self._record(node, [arg_source(node.comparators[0], self._text)])
+        else:
+            self.generic_visit(node)
+
+    def visit_BinOp(self, node):
+        if isinstance(node.op, ast.RShift) and \
+           operand_name(node.left) in self.targets:
+            self._record(node, [arg_source(node.right, self._text)])
+        else:
+            self.generic_visit(node)
+
+
+# Python 3.11+ code objects map every instruction to the exact source span
+# (line and column range) that produced it.
+HAS_POSITIONS = hasattr(call_name.__code__, 'co_positions')
+
+_position_cache = BoundedCache()  # (code, f_lasti) => (call name, arg sources) or None
+_MISSING = object()
+
+
+def position_args(frame):
+    """
+    Return the argument sources of the call that ``frame`` is currently
+    executing, if it is a call to a target function. The frame's instruction
+    offset and its code object's position table (Python 3.11+) locate the
+    exact call expression, so several show calls on one line are told apart.
+    Memoized per (code object, instruction offset), and stored by call
+    position in the sidecar index and disk cache, if in use. Returns
+    ``None`` when the call cannot be found this way, in which case
+    ``CallArgs`` is the fallback.
+    """
+    if not HAS_POSITIONS:
+        return None
+    key = (frame.f_code, frame.f_lasti)
+    found = _position_cache.get(key, _MISSING)
+    if found is _MISSING:
+        found = _find_positioned_call(frame)
+        _position_cache.put(key, found)
+    if found is None or found[0] not in CallArgs.TARGET_FUNCS:
+        return None
+    return found[1]
+
+
+def _find_positioned_call(frame):
+    """
+    Find and parse the call expression at the frame's current instruction.
+    Returns a (call name, arg sources) tuple, or ``None``.
+    """
+    code = frame.f_code
+    filename = code.co_filename
+    if frame_to_source_info(frame) != (filename, frame.f_lineno):
+        # interactive pseudo-file, not addressable by position
+        return None
+    try:
+        lineno, end_lineno, col, end_col = next(islice(code.co_positions(),
+                                                       frame.f_lasti // 2, None))
+    except (StopIteration, ValueError):
+        return None
+    if None in (lineno, end_lineno, col, end_col):
+        return None
+    key = position_key(lineno, col)
+    stored = CallArgs.stored(filename, key)
+    if isinstance(stored, list) and len(stored) == 2:
+        return tuple(stored)
+
+    # column offsets count UTF-8 bytes, not characters
+    try:
+        lines = [getline(filename, n) for n in range(lineno, end_lineno + 1)]
+    except ArgsUnavailable:
+        return None
+    if not all(lines):
+        return None
+    blines = [line.rstrip('\r\n').encode('utf-8') for line in lines]
+    blines[-1] = blines[-1][:end_col]
+    blines[0] = blines[0][col:]
+    try:
+        source = b'\n'.join(blines).decode('utf-8')
+        node = ast.parse(source, mode='eval').body
+    except (UnicodeDecodeError, SyntaxError, ValueError):
+        return None
+    if not isinstance(node, ast.Call):
+        return None
+    text = SourceText(source)
+    found = call_name(node), [arg_source(arg, text) for arg in node.args]
+    if CallArgs.disk_cache is not None:
+        CallArgs.disk_cache.put(filename, key, list(found))
+    return found
+
+
+def position_key(lineno, col):
+    """
+    Key under which the call at the given line and column (in UTF-8 bytes,
+    as code objects and ASTs count them) is stored in the sidecar index and
+    disk cache. Line-level entries are keyed by line number alone.
+    """
+    return '{0}:{1}'.format(lineno, col)
+
+
+def _memo_caches():
+    """
+    Return the in-memory introspection caches, by name. ``reprs`` holds
+    the repr function chosen for each type shown.
+    """
+    return {
+        'CallArgs': CallArgs.memo,
+        'ClassProps': ClassProps.memo,
+        'CallIndex': CallIndex._indexes,
+        'positions': _position_cache,
+        'reprs': _dispatch,
+    }
+
+
+def cache_stats():
+    """
+    Return the size, limit, and hit, miss, and eviction counts of each
+    introspection cache, as a dict of dicts keyed by cache name.
+    """
+    return dict((name, cache.stats()) for name, cache in _memo_caches().items())
+
+
+def limit_caches(maxsize=None, **sizes):
+    """
+    Bound the introspection caches to at most ``maxsize`` entries each,
+    evicting the least recently used. Individual caches can be sized by
+    name, e.g. ``limit_caches(1000, ClassProps=200)``. ``None`` (the
+    default) means unbounded. Long-running processes that ``exec`` generated
+    code or create classes on the fly may want a bound. (``reprs`` alone is
+    bounded from the start, at 1000 types.)
+    """
+    caches = _memo_caches()
+    unknown = set(sizes) - set(caches)
+    if unknown:
+        raise TypeError('unknown caches: {0}'.format(', '.join(sorted(unknown))))
+    for name, cache in caches.items():
+        cache.resize(sizes.get(name, maxsize))
+
+
+@on_invalidate
+def _forget_source(filename):
+    """
+    Drop argument names derived from the given file's source (or from all
+    files, if ``None``), since that source has changed.
+    """
+    if filename is None:
+        CallArgs.memo.clear()
+        CallIndex._indexes.clear()
+        _position_cache.clear()
+    else:
+        CallArgs.memo.prune(lambda key: key[0] == filename)
+        CallIndex._indexes.pop(filename)
+        _position_cache.prune(lambda key: key[0].co_filename == filename)
@@ -0,0 +1,45 @@
+"""
+Structured output: one JSON object per show call (JSON Lines), for log
+pipelines to ingest and filter without parsing human-oriented text::
+
+    show.set(jsonl=True)
+    show(x, y)
+    # {"ts":1500000000.123,"where":"f():12","file":"app.py","line":12,
+    #  "func":"f","pid":4242,"tid":1401,"args":[{"name":"x","type":"int",
+    #  "repr":"1"},{"name":"y","type":"str","repr":"'why'"}]}
+
+Uses ``orjson``, if installed, for speed; else the standard ``json`` module.
+Combine with ``show.use_sink()`` to batch writes (and with ``defer=True`` to
+move the repr work off the calling thread).
+"""
+
+import json
+from .repr import get_repr, type_longname
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = json.JSONEncoder(ensure_ascii=False, check_circular=False,
+                            separators=(',', ':'), default=repr)
+
+
+def dumps(record):
+    """
+    Serialize record (a dict) as compact, one-line JSON text.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(record, default=repr).decode('utf-8')
+        except TypeError:
+            pass    # e.g. non-str keys; let json manage
+    return _encoder.encode(record)
+
+
+def arg_entry(name, value, opts=None):
+    """
+    Return the JSON-ready description of one shown value.
+    """
+    return {'name': name, 'type': type_longname(value),
+            'repr': get_repr(value, opts)}
@@ -2,8 +2,11 @@
 interactive Python and iPython use, too."""
 
 import sys
+import time
 import linecache
+from array import array
 from show.exceptions import ArgsUnavailable
+from show.cache import BoundedCache
 import re
 
 try:
@@ -26,6 +29,162 @@ def frame_to_source_info(frame):
     return frame.f_code.co_filename, frame.f_lineno
 
 
+# Seconds between checks (``stat`` calls) that a file's source is unchanged.
+# 0 checks on every lookup.
+CHECK_INTERVAL = 1.0
+
+_clock = getattr(time, 'monotonic', time.time)
+_checked = {}       # filename => time of last check
+_listeners = []     # called with filename (or None) when source may change
+
+
+def checkcache(filename):
+    """
+    Like ``linecache.checkcache(filename)``, dropping cached source that has
+    changed on disk--but checks each file at most once per
+    ``CHECK_INTERVAL`` seconds, rather than on every lookup. Use
+    ``invalidate()`` to force a recheck sooner.
+    """
+    now = _clock()
+    last = _checked.get(filename)
+    if last is not None and now - last < CHECK_INTERVAL:
+        return
+    _checked[filename] = now
+    cached = filename in linecache.cache
+    linecache.checkcache(filename)
+    if cached and filename not in linecache.cache:
+        _notify(filename)
+
+
+def invalidate(filename=None):
+    """
+    Forget cached source for the given file (or all files, if none given),
+    so that the next lookup re-reads it. Also drops argument names already
+    derived from that source. For reload tools and the like.
+    """
+    if filename is None:
+        _checked.clear()
+        linecache.clearcache()
+    else:
+        _checked.pop(filename, None)
+        linecache.cache.pop(filename, None)
+    _notify(filename)
+
+
+def on_invalidate(func):
+    """
+    Register func to be called with a filename (or ``None``, meaning all
+    files) whenever cached source is found stale or invalidated.
+    """
+    _listeners.append(func)
+    return func
+
+
+def _notify(filename):
+    for func in _listeners:
+        func(filename)
+
+
+class LineBuffer(object):
+    """
+    Compact, append-only store of text lines: one UTF-8 byte buffer, plus an
+    array of where each line starts in it. Lines are indexed by their
+    position in all the lines ever appended (negative indices count back
+    from the most recent), so indices stay stable even as old lines are
+    dropped. At most ``maxlines`` lines are retained; asking for a dropped
+    line raises ``IndexError``.
+    """
+
+    def __init__(self, maxlines=None):
+        self.maxlines = maxlines
+        self.first = 0                  # index of oldest retained line
+        self._buf = bytearray()
+        self._offsets = array('L', [0])  # start of each line, then end
+
+    def append(self, text):
+        """
+        Append the lines of text, split at line breaks. Always appends at
+        least one line, if only an empty one.
+        """
+        for line in text.splitlines() or ['']:
+            self._buf.extend(line.encode('utf-8'))
+            self._offsets.append(len(self._buf))
+        if self.maxlines is not None and self.retained > self.maxlines:
+            self._drop(self.retained - self.maxlines + self.maxlines // 4)
+
+    @property
+    def retained(self):
+        """
+        Number of lines currently held.
+        """
+        return len(self._offsets) - 1
+
+    def __len__(self):
+        """
+        Number of lines ever appended, including any since dropped.
+        """
+        return self.first + self.retained
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        i = index - self.first
+        if not 0 <= i < self.retained or index < 0:
+            raise IndexError('line {0} not retained'.format(index))
+        return self._buf[self._offsets[i]:self._offsets[i + 1]].decode('utf-8')
+
+    def clear(self):
+        """
+        Drop all lines, restarting the indices from 0.
+        """
+        self.first = 0
+        del self._buf[:]
+        self._offsets = array('L', [0])
+
+    def _drop(self, n):
+        """
+        Drop the n oldest lines. Drops are batched (see ``append``) so that
+        the cost of moving the remaining lines is amortized.
+        """
+        n = min(n, self.retained)
+        cut = self._offsets[n]
+        del self._buf[:cut]
+        self._offsets = array('L', (o - cut for o in self._offsets[n:]))
+        self.first += n
+
+
+class CellLines(object):
+    """
+    Cache of IPython cells' source, split into lines, so that the many
+    lookups into one cell (e.g. from a show call in a loop) split it only
+    once. Entries are checked against the current input history entry, so
+    a cell whose text has changed is split afresh. Holds at most
+    ``maxcells`` cells, evicting the least recently used.
+    """
+
+    def __init__(self, maxcells=32):
+        self.cells = BoundedCache(maxcells)  # cellno => (text, lines)
+
+    def get(self, ih, cellno):
+        """
+        Return the lines of cell ``cellno`` of input history ``ih``, with
+        their line endings.
+        """
+        text = ih[cellno]
+        entry = self.cells.get(cellno)
+        if entry is not None and (entry[0] is text or entry[0] == text):
+            return entry[1]
+        lines = text.splitlines(True)
+        self.cells.put(cellno, (text, lines))
+        return lines
+
+    def clear(self):
+        """
+        Forget all cells.
+        """
+        self.cells.clear()
+
+
 if _IPY:
     # Under IPython, depend on _ih for stored source code, so
     # acquire local access to it.
@@ -35,6 +194,8 @@ if _IPY:
     # prepare to parse source references
     CELLRE = re.compile(r'<ipython-input-(\d+)-\w+>')
 
+    cell_lines = CellLines()
+
     def getline(filename, lineno):
         if not _ih:
             return None
@@ -42,15 +203,34 @@ if _IPY:
         if not m:
             # probably %run filepath under IPython
             try:
-                linecache.checkcache(filename)
+                checkcache(filename)
                 return linecache.getline(filename, lineno)
             except Exception:
                 return None
         cellno = int(m.group(1))
         if not cellno:
             return None
-        line = _ih[cellno].splitlines()[lineno-1]
-        return line
+        line = cell_lines.get(_ih, cellno)[lineno-1]
+        return line.splitlines()[0] if line else line
+
+    def getlines(filename):
+        """
+        Return all the source lines of the given file or IPython cell, or
+        ``None`` if they cannot be had.
+        """
+        if not _ih:
+            return None
+        m = CELLRE.match(filename)
+        if not m:
+            try:
+                checkcache(filename)
+                return linecache.getlines(filename) or None
+            except Exception:
+                return None
+        cellno = int(m.group(1))
+        if not cellno:
+            return None
+        return cell_lines.get(_ih, cellno)
 
     def find_cell_loc(frame):
         filename = frame.f_code.co_filename
@@ -81,16 +261,20 @@ elif isInteractive:
     else:
         import readline as rl
 
+    HISTORY_LINES = 10000   # lines of interactive history retained
+
     class History(object):
         """
-        Singleton proxy for readline
+        Singleton proxy for readline. Indexes like the list of history lines,
+        with an extra ``None`` first item to compensate for 0-based indices
+        but 1-based line numbers. Only the most recent ``HISTORY_LINES``
+        lines are retained.
         """
 
-        def __init__(self):
-            self._lines = [None]    # first item None to compensate:
-                                    # 0-based arraysbut 1-based line numbers
+        def __init__(self, maxlines=None):
+            self._buffer = LineBuffer(maxlines or HISTORY_LINES)
             current_item = rl.get_history_item(rl.get_current_history_length())
-            self._lines.append(current_item)
+            self._buffer.append(current_item or '')
             rl.clear_history()
             self._lastseen = rl.get_current_history_length()
             # have we seen it all?
@@ -101,7 +285,15 @@ elif isInteractive:
             The magically self-updating lines property.
             """
             self._update()
-            return self._lines
+            return self
+
+        def __len__(self):
+            return len(self._buffer) + 1
+
+        def __getitem__(self, index):
+            if index == 0 or index == -len(self):
+                return None
+            return self._buffer[index - 1 if index > 0 else index]
 
         def _update(self):
             """
@@ -111,10 +303,12 @@ elif isInteractive:
             cur_hist_len = rl.get_current_history_length()
             if cur_hist_len > self._lastseen:
                 for i in range(self._lastseen + 1, cur_hist_len + 1):
-                    self._lines.extend(rl.get_history_item(i).splitlines())
+                    item = rl.get_history_item(i)
+                    if item:
+                        self._buffer.append(item)
                 self._lastseen = cur_hist_len
 
-            # Fancier splitlines() thing required because iPython stores
+            # Splitting into lines required because iPython stores
             # history lines for multi-line strings with embedded newlines.
             # Interactive Python stores them individually.
 
@@ -129,10 +323,10 @@ elif isInteractive:
             Obliviate! Clear the history.
             """
             rl.clear_history()
-            self._lines = [None]    # first item None to compensate:
-                                    # 0-based arrays but 1-based line numbers
+            self._buffer.clear()
             current_item = rl.get_history_item(rl.get_current_history_length())
-            self._lines.append(current_item)
+            self._buffer.append(current_item or '')
+            self._lastseen = rl.get_current_history_length()
 
     history = History()
 
@@ -164,6 +358,23 @@ elif isInteractive:
         else:
             return linecache.getline(filename, lineno)
 
+    def getlines(filename):
+        """
+        Return all the source lines of the given file, or ``None`` if they
+        cannot be had. Interactive history is not a coherent file, so
+        ``<stdin>`` never has lines.
+        """
+        if filename == '<stdin>':
+            return None
+        return linecache.getlines(filename) or None
+
 else:
     history = None
     getline = linecache.getline
+
+    def getlines(filename):
+        """
+        Return all the source lines of the given file, or ``None`` if they
+        cannot be had.
+        """
+        return linecache.getlines(filename) or None
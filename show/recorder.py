@@ -0,0 +1,221 @@
+"""
+Flight recorder. Most show output is noise until something goes wrong. A
+``FlightRecorder`` is a file-like object that keeps only the most recent
+show records, in a fixed-size ring buffer, and writes nothing--until it is
+dumped: on an unhandled exception, on a signal (``SIGUSR1`` by default), or
+on request::
+
+    rec = show.use_recorder(size=1000, defer=True)
+    ...
+    rec.dump()
+
+With ``defer=True``, show calls just snapshot their values into the buffer;
+formatting is left until (and unless) the buffer is dumped.
+"""
+
+import os
+import sys
+import signal
+import itertools
+import threading
+
+
+class FlightRecorder(object):
+    """
+    Ring buffer holding the last ``size`` records written to it. Writing
+    stores a reference, with its sequence number, in a preallocated slot:
+    no I/O, no formatting, no locking. ``dump`` writes the records, oldest
+    first, to ``file`` (by default, ``sys.stderr`` at the time of the
+    dump).
+    """
+
+    atomic_writes = True        # a write is a single slot assignment
+    accepts_deferred = True     # deferred records are rendered when dumped
+
+    def __init__(self, size=1000, file=None):
+        if size < 1:
+            raise ValueError('size must be at least 1')
+        self.size = size
+        self.file = file
+        self._slots = [None] * size     # (sequence number, record) or None
+        self._count = itertools.count()
+        self._hooks = None
+        self._wake = None               # pipe to the signal dump thread
+
+    def write(self, s):
+        n = next(self._count)
+        self._slots[n % self.size] = (n, s)
+        return 0 if callable(s) else len(s)
+
+    def flush(self):
+        pass
+
+    def __len__(self):
+        """
+        Number of records retained (written, and not yet dumped or cleared).
+        """
+        return sum(1 for r in self._slots if r is not None)
+
+    def records(self):
+        """
+        Return the retained records, oldest first, rendering any deferred
+        ones.
+        """
+        return [_render(r) for n, r in self._snapshot()]
+
+    def dump(self, file=None, clear=True):
+        """
+        Write the retained records to file (else the recorder's ``file``,
+        else ``sys.stderr``), oldest first, between marker lines. Unless
+        ``clear`` is false, they are then forgotten, so a later dump shows
+        only newer records. Returns the number of records dumped.
+        """
+        entries = self._snapshot()
+        records = [_render(r) for n, r in entries]
+        f = file or self.file or sys.stderr
+        f.write('---- show flight recorder: last {0} records ----\n'.format(len(records)))
+        f.write(''.join(records))
+        f.write('---- end of show flight recorder ----\n')
+        try:
+            f.flush()
+        except Exception:
+            pass
+        if clear:
+            self._clear(entries)
+        return len(records)
+
+    def clear(self):
+        """
+        Forget the records written so far.
+        """
+        self._clear(self._snapshot())
+
+    def install(self, excepthook=True, signum=getattr(signal, 'SIGUSR1', None)):
+        """
+        Dump automatically: on an unhandled exception in any thread (if
+        ``excepthook``), and on receiving signal ``signum`` (unless
+        ``None``). Signal handlers can be installed only from the main
+        thread; elsewhere, the signal is skipped and only the exception
+        hooks are installed. On a signal, the dump is made by a background
+        thread, shortly after. Earlier hooks and handlers are still called.
+        """
+        self.uninstall()
+        hooks = {}
+        if excepthook:
+            hooks['sys'] = sys.excepthook
+            sys.excepthook = self._excepthook
+            if hasattr(threading, 'excepthook'):
+                hooks['threading'] = threading.excepthook
+                threading.excepthook = self._thread_excepthook
+        if signum is not None:
+            self._start_dumper()
+            try:
+                hooks['signal'] = (signum, signal.signal(signum, self._signal_handler))
+            except ValueError:      # not the main thread
+                self._stop_dumper()
+        self._hooks = hooks
+        return self
+
+    def uninstall(self):
+        """
+        Remove the hooks and handler set by ``install``, restoring the
+        earlier ones.
+        """
+        hooks, self._hooks = self._hooks, None
+        if not hooks:
+            return
+        if 'sys' in hooks and sys.excepthook == self._excepthook:
+            sys.excepthook = hooks['sys']
+        if 'threading' in hooks and threading.excepthook == self._thread_excepthook:
+            threading.excepthook = hooks['threading']
+        if 'signal' in hooks:
+            signum, handler = hooks['signal']
+            signal.signal(signum, handler if handler is not None else signal.SIG_DFL)
+            self._stop_dumper()
+
+    def _snapshot(self):
+        """
+        Return the (sequence number, record) entries now in the buffer,
+        oldest first. Writers never wait for, or collide with, this.
+        """
+        return sorted((e for e in list(self._slots) if e is not None),
+                      key=lambda e: e[0])
+
+    def _clear(self, entries):
+        """
+        Empty the slots holding the given entries--unless since overwritten.
+        """
+        for entry in entries:
+            i = entry[0] % self.size
+            if self._slots[i] is entry:
+                self._slots[i] = None
+
+    def _start_dumper(self):
+        """
+        Start a thread that dumps whenever woken through a pipe. Signal
+        handlers only write to the pipe, since rendering and writing take
+        locks that the interrupted thread may hold.
+        """
+        r, w = os.pipe()
+        if hasattr(os, 'set_blocking'):
+            os.set_blocking(w, False)       # drop wake-ups, never block
+        self._wake = w
+        t = threading.Thread(target=self._dumper, args=(r,), name='show-recorder')
+        t.daemon = True
+        t.start()
+
+    def _dumper(self, r):
+        """
+        Dump thread: dump once per wake-up, until the pipe is closed.
+        """
+        while True:
+            try:
+                woken = os.read(r, 512)
+            except OSError:
+                woken = b''
+            if not woken:
+                break
+            self._safe_dump()
+        os.close(r)
+
+    def _stop_dumper(self):
+        wake, self._wake = self._wake, None
+        if wake is not None:
+            os.close(wake)
+
+    def _safe_dump(self):
+        try:
+            self.dump()
+        except Exception:
+            pass
+
+    def _excepthook(self, exc_type, exc_value, exc_traceback):
+        self._safe_dump()
+        prior = (self._hooks or {}).get('sys', sys.__excepthook__)
+        prior(exc_type, exc_value, exc_traceback)
+
+    def _thread_excepthook(self, args):
+        self._safe_dump()
+        prior = (self._hooks or {}).get('threading', threading.__excepthook__)
+        prior(args)
+
+    def _signal_handler(self, signum, frame):
+        try:
+            os.write(self._wake, b'!')
+        except (OSError, TypeError):
+            pass
+        prior = (self._hooks or {}).get('signal', (None, None))[1]
+        if callable(prior):
+            prior(signum, frame)
+
+
+def _render(record):
+    """
+    Return a record as a string, rendering it if deferred.
+    """
+    if callable(record):
+        try:
+            return record()
+        except Exception as e:
+            return '<show: cannot render: {0!r}>\n'.format(e)
+    return record
@@ -2,13 +2,20 @@
 Home for repr implementations.
 """
 
+import array
 from pprint import pformat
+from itertools import islice
+from collections import deque
+from .summary import summary_repr
+from .cache import BoundedCache
 from warnings import warn
 from .util import _PY2
 if _PY2:
     from inspect import getargspec
+    from collections import Mapping, Sequence, Set
 else:
     from inspect import getfullargspec
+    from collections.abc import Mapping, Sequence, Set
 
 
 # TODO: make possible to call reprs with the context
@@ -50,50 +57,107 @@ def float_repr(f, opts=None):
 
 
 def np_repr(v, opts=None):
-    np_digits = None
-    try:
-        import numpy as np
-        np_digits = np.get_printoptions()['precision']
-        np.set_printoptions(precision=opts.digits)
-    except:
-        pass
-    result = str(v)
-    if np_digits is not None and np_digits != opts.digits:
-        # Put precision back as we found it
-        np.set_printoptions(np_digits)
-    return ReprStr(result)
-
-    # FIXME: add more graceful repr for numpy objects that doesnt monkeypatch a global
+    """
+    Repr for numpy arrays, as ``str()`` would give, but with precision
+    (``opts.digits``) and abbreviation of large arrays (more than
+    ``opts.maxitems`` items, shown as ``opts.edgeitems`` at each end) given
+    per call, rather than by numpy's global print options--which other
+    threads may be using. Abbreviating takes time proportional to the items
+    shown, not the size of the array. Numeric arrays of more than
+    ``opts.summarize`` items are summarized instead (see ``show.summary``).
+    """
+    if _summarizes(v.size, opts):
+        summary = summary_repr(v, opts)
+        if summary is not None:
+            return ReprStr(summary)
+    import numpy as np  # registered only for numpy types, so numpy is here
+    return ReprStr(np.array2string(v,
+                                   precision=_opt(opts, 'digits', None),
+                                   threshold=_opt(opts, 'maxitems', MAXITEMS),
+                                   edgeitems=_opt(opts, 'edgeitems', EDGEITEMS)))
 
 
 def pd_repr(v, opts=None):
-    pd_float_format = None
-    try:
-        import pandas as pd
-        pd_float_format = pd.get_option('float_format')
-        frepr = lambda f: '{0:0.{1}f}'.format(f, opts.digits)
-        pd.set_option('float_format', frepr)
-    except:
-        pass
-    result = str(v)
-    print('ar:', ascii(result))
-    if pd_float_format is not None:
-        pd.set_option('float_format', pd_float_format)
-    return ReprStr(result)
+    """
+    Repr for pandas Series and DataFrames, much as ``str()`` would give,
+    but with precision (``opts.digits``) given per call, rather than by
+    pandas' global ``float_format`` option--which other threads may be
+    using. Long or wide ones are cut down to pandas' display limits (or,
+    if those are unlimited, to 60 rows and 20 columns) before any
+    formatting, so showing even huge ones takes constant time.
+    """
+    import pandas as pd     # registered only for pandas types, so pandas is here
+    digits = _opt(opts, 'digits', None)
+    params = dict(
+        float_format=None if digits is None else
+                     lambda f: '{0:0.{1}f}'.format(f, digits),
+        max_rows=pd.get_option('display.max_rows') or 60,
+        min_rows=pd.get_option('display.min_rows'),
+    )
+    if isinstance(v, pd.Series):
+        params.update(name=True, dtype=True,
+                      length=pd.get_option('display.show_dimensions'))
+    else:
+        params.update(max_cols=pd.get_option('display.max_columns') or 20,
+                      show_dimensions=pd.get_option('display.show_dimensions'))
+    return ReprStr(v.to_string(**params))
+
+
+_dispatch = BoundedCache(1000)  # type => (repr function, whether it wants opts)
+
+
+class ReprTable(dict):
+    """
+    A dict of repr functions that, whenever changed, makes ``get_repr``
+    forget which repr function it chose for each type.
+    """
+
+
+def _invalidating(name):
+    method = getattr(dict, name)
+
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _dispatch.clear()
 
-    # FIXME: add more graceful repr for pd objects that doesnt monkeypatch a global
+    wrapper.__name__ = name
+    return wrapper
+
+for _name in ('__setitem__', '__delitem__', 'update', 'pop', 'popitem',
+              'setdefault', 'clear'):
+    setattr(ReprTable, _name, _invalidating(_name))
 
 
 # IF there is a better, more concise, or more expressive way to
 # represent a type than ``builtins.repr`` or ``pprint.pformat``,
-# register it here via its full type name (e.g.``type_longname``)
-repr_lookup = {
+# register it here via its full type name (e.g.``type_longname``).
+# Registering by name means modules such as numpy need not be imported
+# to do so. Subclasses of a registered type get its repr too.
+repr_lookup = ReprTable({
     'numpy.ndarray': np_repr,
     'pandas.core.series.Series': pd_repr,
     'numpy.ma.core.MaskedArray': str,
     'pandas.core.frame.DataFrame': pd_repr,
+    'pandas.Series': pd_repr,       # as named by pandas 2 and later
+    'pandas.DataFrame': pd_repr,
     'float': float_repr,
-}
+})
+
+# Or register here by the type itself
+repr_types = ReprTable()
+
+
+def register_repr(cls, func):
+    """
+    Register func as the repr function for type cls (and its subclasses).
+    cls may be a type, or a full type name (e.g. ``'numpy.ndarray'``).
+    """
+    if isinstance(cls, str) or (_PY2 and isinstance(cls, unicode)):
+        repr_lookup[cls] = func
+    else:
+        repr_types[cls] = func
 
 # Lookup of whether a repr function wants opts to be passed in
 repr_wants_opts = {}
@@ -115,14 +179,54 @@ def wants_opts(func):
         # Good sign they cannot take opts context
         return False
 
+MAXLEN = 10000      # default character budget for a value's repr
+MAXITEMS = 1000     # default most items shown from any one container
+EDGEITEMS = 3       # default items shown at each end of a summarized array
+
+
+def _opt(opts, name, default):
+    """
+    Return option name from opts, or default if opts lacks it.
+    """
+    try:
+        value = getattr(opts, name)
+    except (AttributeError, KeyError):
+        return default
+    return default if value is None else value
+
+
+def _summarizes(size, opts):
+    """
+    Should a numeric value of this many items be summarized (see
+    ``show.summary``), rather than shown?
+    """
+    threshold = _opt(opts, 'summarize', None)
+    return threshold is not None and size > threshold
+
+
 def default_repr(value, opts=None):
     """
-    The very most primived, fall-back repr defined by show.
+    The very most primived, fall-back repr defined by show. Numeric
+    sequences longer than ``opts.summarize`` are summarized. Values small
+    enough are pretty-printed; larger ones get a one-line ``bounded_repr``,
+    whose cost depends on the length of the output, not the size of the
+    value.
     """
+    if isinstance(value, (list, tuple, array.array, memoryview)):
+        n = value.nbytes // value.itemsize if isinstance(value, memoryview) else len(value)
+        if _summarizes(n, opts):
+            summary = summary_repr(value, opts)
+            if summary is not None:
+                return summary
     try:
-        width = opts.wrap if opts is not None and opts.wrap else 120
+        maxlen = _opt(opts, 'maxlen', MAXLEN)
+        maxitems = _opt(opts, 'maxitems', MAXITEMS)
+        if exceeds(value, maxlen, maxitems):
+            return bounded_repr(value, maxlen, maxitems)
+        width = _opt(opts, 'wrap', None) or 120
         # beginning of attempts to integrate with surrounding conctext
-        return pformat(value, indent=4, width=width, depth=5)
+        result = pformat(value, indent=4, width=width, depth=5)
+        return result if len(result) <= maxlen else result[:maxlen] + '...'
 
         # At one point show tried to intercept highly generic reprs such as
         # '<__main__.User object at 0x10c73dbd0>' and dive deeper to give a
@@ -132,6 +236,169 @@ def default_repr(value, opts=None):
         warn('Extremely primitive repr')
         return repr(value)
 
+# Builtin containers whose repr bounded_repr composes itself; subclasses
+# that override __repr__ are left to their own
+_BRACKETS = {
+    list: ('[', ']'),
+    tuple: ('(', ')'),
+    set: ('{', '}'),
+    frozenset: ('frozenset({', '})'),
+    dict: ('{', '}'),
+}
+
+_STRINGS = (str, bytes, bytearray, unicode) if _PY2 else (str, bytes, bytearray)
+
+
+def _container(value, maxitems=MAXITEMS):
+    """
+    If value is a container whose repr ``bounded_repr`` can compose, return
+    its (opener, closer, is a mapping). Those are builtin containers (or
+    subclasses keeping their repr), deques, and arrays--plus any other
+    mapping, sequence, or set of more than maxitems items, whose own repr
+    may well take time in proportion to its size. Those are shown as
+    ``TypeName([...])`` or ``TypeName({...})``, as ``reprlib`` would. Else
+    None.
+    """
+    cls = type(value)
+    for base, (opener, closer) in _BRACKETS.items():
+        if isinstance(value, base) and cls.__repr__ is base.__repr__:
+            return opener, closer, base is dict
+    if isinstance(value, deque) and cls.__repr__ is deque.__repr__:
+        if value.maxlen is None:
+            return 'deque([', '])', False
+        return 'deque([', '], maxlen={0})'.format(value.maxlen), False
+    if isinstance(value, array.array) and cls.__repr__ is array.array.__repr__:
+        return "array('{0}', [".format(value.typecode), '])', False
+    if isinstance(value, (Mapping, Sequence, Set)) and not isinstance(value, _STRINGS):
+        try:
+            if len(value) <= maxitems:
+                return None
+        except Exception:
+            return None
+        if isinstance(value, Mapping):
+            return cls.__name__ + '({', '})', True
+        return cls.__name__ + '([', '])', False
+    return None
+
+
+def exceeds(value, maxlen=MAXLEN, maxitems=MAXITEMS, depth=5):
+    """
+    Is value too big to pretty-print within the budgets: a container with
+    more than ``maxitems`` items, a string longer than ``maxlen``, or
+    more than ``maxlen // 3`` items all told (as each needs at least a few
+    characters)? Looks at only as much of the value as it takes to tell.
+    """
+    budget = [maxlen // 3]
+
+    def walk(v, level):
+        if isinstance(v, _STRINGS):
+            return len(v) > maxlen
+        shape = _container(v, maxitems)
+        if shape is None or level > depth:
+            return False
+        n = len(v)
+        budget[0] -= n
+        if n > maxitems or budget[0] < 0:
+            return True
+        items = v.items() if shape[2] else v
+        for item in items:
+            if shape[2]:
+                if walk(item[0], level + 1) or walk(item[1], level + 1):
+                    return True
+            elif walk(item, level + 1):
+                return True
+        return False
+
+    return walk(value, 1)
+
+
+class _Spent(Exception):
+    """
+    The character budget of a ``bounded_repr`` is spent.
+    """
+
+
+def bounded_repr(value, maxlen=MAXLEN, maxitems=MAXITEMS, depth=5):
+    """
+    Return a one-line repr of value, of at most about maxlen characters.
+    Walks value only until that many characters are produced, so its cost
+    is bounded by the output, however large the value. Shows at most
+    maxitems items of each container, noting how many more there are;
+    containers nested more than depth deep are shown as ``...``. Dicts and
+    sets are sorted (as ``pprint`` does) only if they have no more than
+    maxitems items.
+    """
+    parts = []
+    left = [maxlen]
+
+    def emit(s):
+        if len(s) > left[0]:
+            parts.append(s[:left[0]])
+            raise _Spent
+        left[0] -= len(s)
+        parts.append(s)
+
+    def walk(v, level, active):
+        if isinstance(v, _STRINGS):
+            emit(repr(v[:left[0]]) if len(v) > left[0] else repr(v))
+            return
+        shape = _container(v, maxitems)
+        if shape is None:
+            emit(repr(v))
+            return
+        if id(v) in active:
+            emit('<Recursion on {0} with id={1}>'.format(type(v).__name__, id(v)))
+            return
+        opener, closer, mapping = shape
+        if not v:
+            emit(repr(v))
+            return
+        if level > depth:
+            emit(opener + '...' + closer)
+            return
+        active.add(id(v))
+        emit(opener)
+        items = _first_items(v, mapping, maxitems)
+        for i, item in enumerate(items):
+            if i:
+                emit(', ')
+            if mapping:
+                walk(item[0], level + 1, active)
+                emit(': ')
+                walk(item[1], level + 1, active)
+            else:
+                walk(item, level + 1, active)
+        if len(v) > len(items):
+            emit(', ... ({0:,} more)'.format(len(v) - len(items)))
+        elif opener == '(' and len(v) == 1:
+            emit(',')
+        emit(closer)
+        active.discard(id(v))
+
+    try:
+        walk(value, 1, set())
+    except _Spent:
+        parts.append('...')
+    return ''.join(parts)
+
+
+def _first_items(v, mapping, maxitems):
+    """
+    Return the first maxitems items of container v (key, value pairs for
+    mappings), in pprint's sorted order for dicts and sets with no more
+    than that.
+    """
+    items = v.items() if mapping else v
+    if len(v) <= maxitems and isinstance(v, (dict, set, frozenset)):
+        try:
+            return sorted(items, key=(lambda kv: kv[0]) if mapping else None)
+        except TypeError:
+            pass
+    if isinstance(v, (list, tuple)):
+        return v[:maxitems]
+    return list(islice(items, maxitems))
+
+
 # TODO: integrate with width of terminal or show object
 # TODO: determine how to integrate with IPython _repr_html_
 
@@ -144,17 +411,42 @@ def get_repr(value, opts=None):
     terse, e.g. for NumPy and Pandas objects. They also obey local settings
     like opts.digits.
     """
-    type_name = type_longname(value)
-    rfunc = repr_lookup.get(type_name, default_repr)
+    cls = type(value)
+    found = _dispatch.get(cls)
+    if found is None:
+        found = _resolve_repr(cls)
+        _dispatch.put(cls, found)
+    rfunc, takes_opts = found
 
     # Call repr, ideally with opts, but naked otherwise
-    takes_opts = repr_wants_opts.setdefault(rfunc, wants_opts(rfunc))
     return rfunc(value, opts=opts) if takes_opts else rfunc(value)
 
 
+def _resolve_repr(cls):
+    """
+    Find the repr function for type cls: that registered for the nearest
+    class in its MRO (by type, else by name), else ``default_repr``. Returns
+    it, along with whether it wants opts.
+    """
+    rfunc = default_repr
+    for c in getattr(cls, '__mro__', (cls,)):
+        found = repr_types.get(c) or repr_lookup.get(_class_longname(c))
+        if found is not None:
+            rfunc = found
+            break
+    takes_opts = repr_wants_opts.get(rfunc)
+    if takes_opts is None:
+        takes_opts = repr_wants_opts[rfunc] = wants_opts(rfunc)
+    return rfunc, takes_opts
+
+
 
 def type_longname(obj):
-    s = str(type(obj))
+    return _class_longname(type(obj))
+
+
+def _class_longname(cls):
+    s = str(cls)
     if s.startswith("<class '"):
         # strip off the "<class '" prefix and '> suffix
         return s[8:-2]
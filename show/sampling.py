@@ -0,0 +1,114 @@
+"""
+Sampling and rate limiting of show output, per call site. A ``show(x)`` in a
+hot loop can be told to show only some of its calls::
+
+    show(x, every=1000)     # the 1st, 1001st, 2001st, ... calls
+    show(x, sample=0.01)    # a random 1% of calls
+    show(x, rate=10)        # at most 10 calls a second (bursts up to 10)
+    show.set(rate=5, burst=20)
+
+Whether to show is decided before any introspection or formatting, so
+skipped calls are cheap. When a call site shows again after skipping some
+calls, its output notes how many were suppressed.
+"""
+
+import time
+import random
+import threading
+from .cache import BoundedCache
+
+
+class SiteState(object):
+    """
+    Sampling state of one call site.
+    """
+
+    __slots__ = ('calls', 'suppressed', 'tokens', 'stamp')
+
+    def __init__(self):
+        self.calls = 0          # calls seen
+        self.suppressed = 0     # calls skipped since the last one shown
+        self.tokens = None      # token bucket level (when rate limited)
+        self.stamp = None       # when the bucket was last refilled
+
+
+class Sampler(object):
+    """
+    Decides, call site by call site, which calls to show. Keeps state for
+    at most ``maxsites`` sites, forgetting the least recently used.
+    """
+
+    def __init__(self, maxsites=10000, clock=None, random=random.random):
+        self.sites = BoundedCache(maxsites)
+        self.clock = clock or getattr(time, 'monotonic', time.time)
+        self.random = random
+        self._lock = threading.Lock()
+
+    def admit(self, key, every=None, sample=None, rate=None, burst=None):
+        """
+        Should this call, at the site identified by key, be shown? Returns
+        (admitted, suppressed): whether to show it, and if so, how many calls
+        at the site were skipped since the last one shown.
+
+        :every: show only every Nth call (the first, then every Nth after)
+        :sample: show each call with this probability (0 to 1)
+        :rate: show at most this many calls per second, on average
+        :burst: allow bursts of up to this many calls (default: ``rate``,
+                but at least 1)
+        """
+        with self._lock:
+            site = self.sites.get(key)
+            if site is None:
+                site = SiteState()
+                self.sites.put(key, site)
+            site.calls += 1
+            admitted = True
+            if every and (site.calls - 1) % every:
+                admitted = False
+            if admitted and sample is not None and self.random() >= sample:
+                admitted = False
+            if admitted and rate is not None:
+                admitted = self._take_token(site, rate, burst)
+            if not admitted:
+                site.suppressed += 1
+                return False, 0
+            suppressed, site.suppressed = site.suppressed, 0
+            return True, suppressed
+
+    def _take_token(self, site, rate, burst):
+        """
+        Token bucket: refill at ``rate`` tokens a second, up to ``burst``;
+        each call shown takes one.
+        """
+        capacity = max(burst or rate, 1)
+        now = self.clock()
+        if site.tokens is None:
+            site.tokens = capacity
+        else:
+            site.tokens = min(capacity, site.tokens + (now - site.stamp) * rate)
+        site.stamp = now
+        if site.tokens >= 1:
+            site.tokens -= 1
+            return True
+        return False
+
+    def clear(self):
+        """
+        Forget the state of all call sites.
+        """
+        self.sites.clear()
+
+    def reset(self):
+        """
+        Forget the state of all call sites, and renew the lock. For a forked
+        child, which should count its own calls, not its parent's.
+        """
+        self._lock = threading.Lock()
+        self.sites.clear()
+
+
+def suppressed_note(n):
+    """
+    Return the note that n calls were suppressed, e.g. ``(1,204 suppressed)``.
+    """
+    return '({0:,} suppressed)'.format(n)
@@ -0,0 +1,275 @@
+"""
+Asynchronous output for ``show``. An ``AsyncSink`` is a file-like object
+that ``say`` can write to. Writes are queued; a background thread drains the
+queue into the real output files, in batches, so that slow terminals, pipes,
+or network filesystems do not hold up the threads doing the showing::
+
+    show.use_sink(maxsize=10000, policy='drop-oldest')
+
+Queued output is flushed when the program exits.
+"""
+
+import os
+import sys
+import time
+import atexit
+import weakref
+import threading
+from collections import deque
+from .writer import write_record
+from .util import on_fork
+
+POLICIES = ('block', 'drop-oldest', 'drop-newest')
+
+_sinks = weakref.WeakSet()  # live sinks, to be flushed at exit
+
+
+class AsyncSink(object):
+    """
+    File-like writer that hands its output to a background thread. Besides
+    strings, accepts deferred records (see ``show.defer``), which the
+    background thread renders before writing. Holds at
+    most ``maxsize`` pending records; when full, the ``policy`` decides
+    what happens to new ones:
+
+    ``'block'``
+        wait for room (the default; nothing is lost)
+    ``'drop-oldest'``
+        discard the oldest pending record to make room
+    ``'drop-newest'``
+        discard the record being written
+
+    The writer thread joins up to ``batch`` pending records into a single
+    ``write`` call on each of the underlying ``files``. Dropped records and
+    failed writes are counted (see ``stats``).
+    """
+
+    atomic_writes = True    # each write is queued whole, under the lock
+    accepts_deferred = True # deferred records are rendered by the writer
+
+    def __init__(self, files=None, maxsize=10000, policy='block', batch=256):
+        if policy not in POLICIES:
+            raise ValueError('policy must be one of {0}, not {1!r}'.format(
+                             ', '.join(POLICIES), policy))
+        if files is None:
+            files = [sys.stdout]
+        elif not isinstance(files, (list, tuple)):
+            files = [files]
+        self.files = list(files)
+        self.maxsize = maxsize
+        self.policy = policy
+        self.batch = batch
+        self.written = 0        # records written
+        self.dropped = 0        # records discarded because the queue was full
+        self.batches = 0        # write calls made (per file)
+        self.errors = 0         # batches that failed to write
+        self._reset()
+        _sinks.add(self)
+
+    def _reset(self):
+        """
+        Start afresh: new queue, lock, and (when first needed) thread. Also
+        used in a forked child, which inherits its parent's pending output
+        (which is not the child's to write) but not its writer thread.
+        """
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._inflight = 0      # records taken by the writer, not yet written
+        self._closing = False
+        self._thread = None
+        self._pid = os.getpid()
+
+    def write(self, s):
+        """
+        Queue s to be written. Returns without waiting for it to be written
+        (unless the queue is full and the policy is ``'block'``).
+        """
+        n = 0 if callable(s) else len(s)
+        if self._pid != os.getpid():
+            self._reset()
+        with self._cond:
+            if self._thread is None:
+                self._start()
+            if len(self._queue) >= self.maxsize:
+                if self.policy == 'drop-newest':
+                    self.dropped += 1
+                    return n
+                elif self.policy == 'drop-oldest':
+                    self._queue.popleft()
+                    self.dropped += 1
+                else:
+                    while len(self._queue) >= self.maxsize and \
+                          self._thread.is_alive():
+                        self._cond.wait()
+            self._queue.append(s)
+            self._cond.notify_all()
+        return n
+
+    def flush(self, timeout=None):
+        """
+        Wait until everything queued so far has been written, then flush the
+        underlying files. Returns ``False`` if the timeout (in seconds)
+        expired first, else ``True``.
+        """
+        if self._pid != os.getpid():
+            self._reset()
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._drain()
+            elif self._thread is not threading.current_thread():
+                done = lambda: not self._queue and not self._inflight
+                if not _wait_for(self._cond, done, timeout):
+                    return False
+        for f in self.files:
+            try:
+                f.flush()
+            except Exception:
+                pass
+        return True
+
+    def close(self):
+        """
+        Write out everything pending and stop the writer thread. The
+        underlying files are left open. Writes after closing start a new
+        writer thread.
+        """
+        self.flush()
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        with self._cond:
+            self._drain()
+            self._thread = None
+            self._closing = False
+
+    def stats(self):
+        """
+        Return a dict of the sink's counters and current queue length.
+        """
+        return dict(written=self.written, dropped=self.dropped,
+                    batches=self.batches, errors=self.errors,
+                    queued=len(self._queue), maxsize=self.maxsize,
+                    policy=self.policy)
+
+    def _start(self):
+        """
+        Start the writer thread. Called with the lock held.
+        """
+        self._thread = threading.Thread(target=self._run, name='show-sink')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        """
+        Writer thread: take batches off the queue and write them.
+        """
+        cond = self._cond
+        while True:
+            with cond:
+                while not self._queue and not self._closing:
+                    cond.wait()
+                if not self._queue:
+                    return
+                records = self._take()
+                cond.notify_all()   # room for blocked writers
+            self._emit(records)
+            with cond:
+                self._inflight = 0
+                cond.notify_all()   # progress for flushers
+
+    def _take(self):
+        """
+        Remove and return the next batch of records. Called with the lock
+        held.
+        """
+        n = min(len(self._queue), self.batch)
+        records = [self._queue.popleft() for _ in range(n)]
+        self._inflight = n
+        return records
+
+    def _drain(self):
+        """
+        Write out everything queued, on this thread. For when no writer
+        thread is running. Called with the lock held.
+        """
+        while self._queue:
+            self._emit(self._take())
+            self._inflight = 0
+
+    def _emit(self, records):
+        """
+        Write a batch of records to each of the files, in one call each.
+        Deferred records (callables, see ``show.defer``) are rendered here.
+        """
+        failed = False
+        try:
+            data = ''.join(records)
+        except TypeError:
+            data, failed = self._render(records)
+        for f in self.files:
+            try:
+                write_record(f, data)
+            except Exception:
+                failed = True
+        self.batches += 1
+        if failed:
+            self.errors += 1
+        self.written += len(records)
+
+    def _render(self, records):
+        """
+        Join records, rendering deferred ones. Returns the joined string and
+        whether any failed to render.
+        """
+        parts, failed = [], False
+        for r in records:
+            if callable(r):
+                try:
+                    r = r()
+                except Exception as e:
+                    r = '<show: cannot render: {0!r}>\n'.format(e)
+                    failed = True
+            parts.append(r)
+        return ''.join(parts), failed
+
+
+@on_fork
+def _reset_all():
+    """
+    Reset every sink in a forked child. (Sinks also notice a change of
+    process on their next write, where fork hooks are not available.)
+    """
+    for sink in list(_sinks):
+        sink._reset()
+
+
+def _wait_for(cond, predicate, timeout):
+    """
+    ``Condition.wait_for``, which Python 2 lacks. Called with cond held.
+    """
+    if timeout is None:
+        while not predicate():
+            cond.wait()
+        return True
+    deadline = time.time() + timeout
+    while not predicate():
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False
+        cond.wait(remaining)
+    return True
+
+
+@atexit.register
+def _flush_all():
+    """
+    Flush every live sink, so that pending output is not lost at exit.
+    """
+    for sink in list(_sinks):
+        try:
+            sink.flush(timeout=5.0)
+        except Exception:
+            pass
@@ -0,0 +1,234 @@
+# -*- encoding: utf-8 -*-
+
+"""
+Numeric summaries. For large numeric data, the values themselves are rarely
+what one wants to see; their shape and distribution are::
+
+    show.summary(x)
+
+    x: <ndarray (1000, 1000) float64> min=-4.87 max=5.01 mean=0.0003 std=1 nan=0 inf=0 ▁▂▄▆█▆▄▂▁ [-4.87, 5.01]
+
+    show.set(summarize=10000)   # summarize larger arrays and sequences
+
+NumPy arrays are summarized with vectorized operations. Lists, tuples,
+``array.array``, and ``memoryview`` objects are summarized in one streaming
+pass, without copying, using Welford's algorithm for the mean and standard
+deviation, and a histogram whose bins widen as needed to cover the values
+seen.
+"""
+
+import math
+import array
+import numbers
+from .util import _PY2
+
+BINS = 10   # histogram bins (must be even)
+BARS = u'▁▂▃▄▅▆▇█'
+
+_plain = (int, float, bool, long) if _PY2 else (int, float, bool)
+_formats = frozenset('bBhHiIlLqQnNfd?')   # memoryview formats it can iterate
+
+
+def summarize(value, bins=BINS):
+    """
+    Return a dict of summary statistics for numeric value: ``kind``,
+    ``shape``, ``dtype``, ``count``, ``min``, ``max``, ``mean``, ``std``
+    (population), ``nan``, ``inf``, and ``hist`` (bin counts, spanning
+    ``lo`` to ``hi``). Min, max, mean, std, and the histogram are of the
+    finite values. Raises ``TypeError`` if value is not numeric.
+    """
+    if type(value).__module__.split('.')[0] == 'numpy':
+        return _summarize_numpy(value, bins)
+    if isinstance(value, memoryview):
+        items, shape, dtype = _memoryview_items(value), value.shape, value.format
+    elif isinstance(value, array.array):
+        items, shape, dtype = value, (len(value),), value.typecode
+    elif isinstance(value, (list, tuple)):
+        items, shape, dtype = value, (len(value),), None
+    else:
+        raise TypeError('cannot summarize {0}'.format(type(value).__name__))
+    stats = _summarize_stream(items, bins)
+    stats.update(kind=type(value).__name__, shape=shape,
+                 dtype=dtype or ', '.join(stats.pop('types')) or '?')
+    return stats
+
+
+def _memoryview_items(m):
+    """
+    Return memoryview m, or a flat view of it if it is multidimensional.
+    Raises ``TypeError`` for views it cannot iterate: those of non-native
+    or non-numeric formats, and non-contiguous multidimensional ones.
+    """
+    if m.format.lstrip('@') not in _formats or m.ndim < 1:
+        raise TypeError('cannot summarize memoryview of format {0!r}'.format(m.format))
+    if m.ndim == 1:
+        return m
+    if not m.c_contiguous:
+        raise TypeError('cannot summarize non-contiguous memoryview')
+    return m.cast('B').cast(m.format.lstrip('@'))
+
+
+def _summarize_numpy(value, bins):
+    import numpy as np
+    a = np.asarray(value)
+    if a.dtype.kind not in 'biuf':
+        raise TypeError('cannot summarize {0} arrays'.format(a.dtype))
+    if a.dtype.kind == 'b':
+        a = a.astype(np.uint8)
+    finite = np.isfinite(a)
+    nfinite = int(np.count_nonzero(finite))
+    nnan = int(np.count_nonzero(np.isnan(a)))
+    stats = dict(kind=type(value).__name__, shape=a.shape, dtype=str(a.dtype),
+                 count=a.size, nan=nnan, inf=a.size - nfinite - nnan,
+                 min=None, max=None, mean=None, std=None, hist=[], lo=None, hi=None)
+    if nfinite:
+        f = a[finite] if nfinite < a.size else a.ravel()
+        lo, hi = f.min().item(), f.max().item()
+        counts = np.histogram(f, bins=bins, range=(lo, hi))[0] if lo < hi else [nfinite]
+        stats.update(min=lo, max=hi, mean=float(f.mean(dtype=np.float64)),
+                     std=float(f.std(dtype=np.float64)),
+                     hist=[int(c) for c in counts], lo=lo, hi=hi)
+    return stats
+
+
+def _summarize_stream(items, bins):
+    """
+    Summarize numbers in one pass over items.
+    """
+    n = nan = inf = 0
+    mean = m2 = 0.0
+    lo = hi = None
+    hist = _Histogram(bins)
+    types = []
+    isfinite = math.isfinite if hasattr(math, 'isfinite') else \
+        lambda x: not (math.isnan(x) or math.isinf(x))
+    for x in items:
+        if type(x) not in _plain and not isinstance(x, numbers.Real):
+            raise TypeError('cannot summarize {0} values'.format(type(x).__name__))
+        if type(x).__name__ not in types:
+            types.append(type(x).__name__)
+        if type(x) is not int and not isfinite(x):
+            if x != x:
+                nan += 1
+            else:
+                inf += 1
+            continue
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+        if lo is None or x < lo:
+            lo = x
+        if hi is None or x > hi:
+            hi = x
+        hist.add(x)
+    return dict(count=n + nan + inf, nan=nan, inf=inf, min=lo, max=hi,
+                mean=mean if n else None, std=math.sqrt(m2 / n) if n else None,
+                hist=hist.counts(), lo=lo, hi=hi, types=types)
+
+
+class _Histogram(object):
+    """
+    Streaming histogram of a fixed number of bins, which doubles its bins'
+    width (merging neighbors) whenever a value falls outside its range, so
+    it needs no range given up front. Keeps four times as many bins as it
+    reports, since the values may come to fill as little as half its range.
+    """
+
+    def __init__(self, bins):
+        self.nreport = bins
+        self.nbins = bins * 4
+        self.bins = None
+        self.first = None   # the value seen, while all values seen are equal
+        self.nfirst = 0
+
+    def add(self, x):
+        if self.bins is None:
+            if self.nfirst == 0 or x == self.first:
+                self.first = x
+                self.nfirst += 1
+                return
+            lo, hi = min(x, self.first), max(x, self.first)
+            self.lo, self.width = lo, float(hi - lo) / self.nbins
+            self.bins = [0] * self.nbins
+            self._put(self.first, self.nfirst)
+        while x > self.lo + self.width * self.nbins:
+            self._widen(up=True)
+        while x < self.lo:
+            self._widen(up=False)
+        self._put(x, 1)
+
+    def _put(self, x, count):
+        i = min(int((x - self.lo) / self.width), self.nbins - 1)
+        self.bins[i] += count
+
+    def _widen(self, up):
+        """
+        Double the bin width, keeping the low edge (if growing up) or the
+        high edge (if down) fixed.
+        """
+        b, half = self.bins, self.nbins // 2
+        pairs = [b[2 * i] + b[2 * i + 1] for i in range(half)]
+        if up:
+            self.bins = pairs + [0] * half
+        else:
+            self.bins = [0] * half + pairs
+            self.lo -= self.width * self.nbins
+        self.width *= 2
+
+    def counts(self):
+        """
+        Return the bin counts over the range of the values (trimming empty
+        bins at either end), merged into no more bins than asked for.
+        """
+        if self.bins is None:
+            return [self.nfirst] if self.nfirst else []
+        b = self.bins
+        first = next(i for i, c in enumerate(b) if c)
+        last = max(i for i, c in enumerate(b) if c)
+        b = b[first:last + 1]
+        k = -(-len(b) // self.nreport)     # bins to merge into each
+        return [sum(b[i:i + k]) for i in range(0, len(b), k)]
+
+
+def sparkline(counts):
+    """
+    Render histogram counts as a row of bars.
+    """
+    top = max(counts) if counts else 0
+    if not top:
+        return ''
+    n = len(BARS) - 1
+    return u''.join(BARS[c * n // top] if c else u' ' for c in counts)
+
+
+def format_summary(stats, digits=4):
+    """
+    Render summary statistics (from ``summarize``) as one line.
+    """
+    def num(x):
+        return '-' if x is None else '{0:.{1}g}'.format(x, digits)
+
+    shape = stats['shape']
+    shape = str(shape[0]) if len(shape) == 1 else str(tuple(shape))
+    parts = [u'<{0} {1} {2}>'.format(stats['kind'], shape, stats['dtype'])]
+    parts += [u'{0}={1}'.format(k, num(stats[k])) for k in ('min', 'max', 'mean', 'std')]
+    parts += [u'nan={0}'.format(stats['nan']), u'inf={0}'.format(stats['inf'])]
+    if stats['hist']:
+        parts.append(u'{0} [{1}, {2}]'.format(sparkline(stats['hist']),
+                                             num(stats['lo']), num(stats['hi'])))
+    return u' '.join(parts)
+
+
+def summary_repr(value, opts=None):
+    """
+    Repr giving a summary of numeric value; for values that are not
+    numeric, or cannot be summarized (say, integers too large to make
+    floats of), ``None``.
+    """
+    from .repr import _opt
+    try:
+        stats = summarize(value)
+    except (TypeError, ValueError, OverflowError, NotImplementedError):
+        return None
+    return format_summary(stats, _opt(opts, 'digits', 4))
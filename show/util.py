@@ -1,10 +1,13 @@
 import fnmatch
 from say.util import stringify
 import sys
+import os
 
 _PY2 = sys.version_info[0] == 2
 string_types = (str, unicode) if _PY2 else str
 
+_fork_handlers = []
+
 def is_string(obj):
     return isinstance(obj, string_types)
 
@@ -84,3 +87,26 @@ def ellipsis(s, maxlen=232):
         return s
 
     # TODO: do we really want ... at end, or in middle?
+
+
+def on_fork(func):
+    """
+    Register func to be called, with no arguments, in the child process
+    after a fork, to reset locks and per-process state the child inherits
+    (where ``os.register_at_fork`` is available, Python 3.7+). Returns func,
+    so it can be used as a decorator.
+    """
+    _fork_handlers.append(func)
+    return func
+
+
+def _after_fork():
+    for func in _fork_handlers:
+        try:
+            func()
+        except Exception:
+            pass
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,82 @@
+"""
+Atomic output. Each show record--location, values, and line ending--goes to
+each output file in a single ``write`` call, under a per-file lock, so that
+records from several threads never interleave mid-line. The lock is taken
+only while more than one thread is running; a single-threaded program pays
+nothing for it. Locks are real locks, not the GIL, so this holds on
+free-threaded Python builds too.
+"""
+
+import weakref
+import threading
+from say.core import SayReturn
+from .util import on_fork
+
+_locks = weakref.WeakKeyDictionary()    # file => lock serializing writes to it
+_making = [threading.Lock()]            # held while making a lock
+_shared = [threading.RLock()]   # lock for all files that cannot be weakly referenced
+
+
+def lock_for(f):
+    """
+    Return the lock serializing writes to file f. Forgotten when f is.
+    The rare files that are unhashable or not weakly referenceable all
+    share one lock.
+    """
+    try:
+        lock = _locks.get(f)
+    except TypeError:
+        return _shared[0]
+    if lock is None:
+        with _making[0]:
+            lock = _locks.get(f)
+            if lock is None:
+                lock = _locks[f] = threading.RLock()
+    return lock
+
+
+@on_fork
+def _forget_locks():
+    """
+    Start a forked child with no locks, in case it inherited one held.
+    """
+    _locks.clear()
+    _making[0] = threading.Lock()
+    _shared[0] = threading.RLock()
+
+
+def write_record(f, s):
+    """
+    Write s to f in one call, atomically with respect to other threads
+    writing records to f. Files that serialize writes themselves (marked
+    with a true ``atomic_writes`` attribute, like ``AsyncSink``) are
+    written directly.
+    """
+    if threading.active_count() > 1 and not getattr(f, 'atomic_writes', False):
+        with lock_for(f):
+            f.write(s)
+    else:
+        f.write(s)
+
+
+class ShowSay(SayReturn):
+    """
+    ``SayReturn`` that writes each output string with ``write_record``, and
+    composes it once rather than once for returning and again for writing.
+    """
+
+    def _output(self, data, opts):
+        """
+        Construct the output string, write it to files, and return it.
+        """
+        outstr = self._outstr(data, opts)
+        if opts.trimrv and opts.end and outstr.endswith(opts.end):
+            retstr = outstr[:-len(opts.end)]
+        else:
+            retstr = outstr
+
+        if not opts.silent:
+            for f in opts.files:
+                write_record(f, outstr)
+
+        return retstr
@@ -0,0 +1,65 @@
+
+from show.cache import BoundedCache, MemoMetaclass
+from mementos import with_metaclass
+import pytest
+
+
+def test_BoundedCache_unbounded():
+    c = BoundedCache()
+    for i in range(100):
+        c.put(i, str(i))
+    assert len(c) == 100
+    assert c.pop(99) == '99'
+    assert c.pop(99) is None
+    assert c.get(5) == '5'
+    assert c.get(500) is None
+    assert c.get(500, 'x') == 'x'
+    assert c.stats() == dict(size=99, maxsize=None, hits=1, misses=2, evictions=0)
+
+
+def test_BoundedCache_lru():
+    c = BoundedCache(3)
+    c.put('a', 1)
+    c.put('b', 2)
+    c.put('c', 3)
+    assert c.get('a') == 1     # a now most recently used
+    c.put('d', 4)              # so b is evicted
+    assert 'b' not in c
+    assert 'a' in c and 'c' in c and 'd' in c
+    assert c.evictions == 1
+
+    c.resize(1)
+    assert len(c) == 1 and 'd' in c
+    assert c.evictions == 3
+
+    c.clear()
+    assert c.stats() == dict(size=0, maxsize=1, hits=0, misses=0, evictions=0)
+
+
+def test_MemoMetaclass():
+
+    class Thing(with_metaclass(MemoMetaclass, object)):
+        made = 0
+        def __init__(self, x, y=0):
+            Thing.made += 1
+            self.x = x
+            self.y = y
+
+    class Other(with_metaclass(MemoMetaclass, object)):
+        def __init__(self, x):
+            self.x = x
+
+    assert Thing(1) is Thing(1)
+    assert Thing(1, y=2) is Thing(1, y=2)
+    assert Thing(1) is not Thing(2)
+    assert Thing.made == 3
+    assert Thing.memo.stats()['hits'] == 3
+    assert Other.memo is not Thing.memo
+    assert len(Other.memo) == 0
+
+    Thing.memo.resize(1)
+    t2 = Thing(2)
+    assert Thing(2) is t2
+    Thing(3)
+    assert Thing(2) is not t2
+    assert Thing.memo.evictions > 0
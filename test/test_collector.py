@@ -0,0 +1,104 @@
+
+import io
+import os
+import sys
+import time
+import pytest
+from show import show
+from show.collector import Collector, CollectorClient, ENVIRON_KEY, _collectors
+from show.core import sampler
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+
+
+def in_child(func):
+    """
+    Run func in a forked child; return its exit status.
+    """
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            code = func() or 0
+        finally:
+            os._exit(code)
+    return os.waitpid(pid, 0)[1] >> 8, pid
+
+
+def wait_for_lines(out, n, timeout=5.0):
+    deadline = time.time() + timeout
+    while out.getvalue().count('\n') < n and time.time() < deadline:
+        time.sleep(0.01)
+    return out.getvalue().splitlines()
+
+
+def test_Collector():
+    out = io.StringIO()
+    c = Collector(out)
+    assert os.environ[ENVIRON_KEY] == c.address
+    client = CollectorClient(c.address)
+    client.write('one\ntw')
+    client.write('o\n')
+
+    def child():
+        client.write('three\n')
+        client.write('four')        # unterminated; written on hangup
+        client.close()
+
+    status, cpid = in_child(child)
+    assert status == 0
+    client.close()
+    c.close()
+    assert ENVIRON_KEY not in os.environ
+    assert not os.path.exists(c.address)
+    me = os.getpid()
+    lines = out.getvalue().splitlines()
+    assert [l for l in lines if l.startswith('[{0}]'.format(me))] == \
+        ['[{0}] one'.format(me), '[{0}] two'.format(me)]
+    assert [l for l in lines if l.startswith('[{0}]'.format(cpid))] == \
+        ['[{0}] three'.format(cpid), '[{0}] four'.format(cpid)]
+    assert c.stats()['clients'] == 2
+
+
+def test_use_collector():
+    out = io.StringIO()
+    s = show.clone(where=False)
+    s.say.setfiles([out])
+    sink = s.use_collector()
+    collector = [c for c in _collectors if c.address == os.environ[ENVIRON_KEY]][0]
+    try:
+        x = 1
+        s(x)
+
+        def child():
+            x = 2
+            s(x)
+            sink.flush()
+
+        status, cpid = in_child(child)
+        assert status == 0
+        sink.flush()
+        lines = wait_for_lines(out, 2)
+        assert sorted(lines) == sorted(['[{0}] x: 1'.format(os.getpid()),
+                                        '[{0}] x: 2'.format(cpid)])
+    finally:
+        sink.close()
+        collector.close()
+
+
+@pytest.mark.skipif(not hasattr(os, 'register_at_fork'),
+                    reason='needs os.register_at_fork')
+def test_fork_resets_state():
+    s = show.clone(where=False, retvalue=True)
+    s.say.setfiles([io.StringIO()])
+    x = 1
+    s(x, every=100)
+    assert len(sampler.sites)
+
+    def child():
+        if len(sampler.sites):
+            return 2
+        if s(x, every=100) != 'x: 1':   # first call at site, in the child
+            return 3
+
+    assert in_child(child)[0] == 0
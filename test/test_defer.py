@@ -0,0 +1,49 @@
+
+import pytest
+from show.defer import *
+
+
+class Record(object):
+    def __init__(self, items):
+        self.items = items
+
+
+class SubRecord(Record):
+    pass
+
+
+def test_snapshot_defaults():
+    lst = [[1], 2]
+    snap = snapshot(lst)
+    assert snap == lst and snap is not lst
+    assert snap[0] is lst[0]                # shallow
+    s = 'string'
+    assert snapshot(s) is s
+    r = Record([1])
+    assert snapshot(r) is r                 # by reference
+
+
+def test_copy_policy():
+    copy_policy(Record, 'deep')
+    try:
+        r = SubRecord([1])
+        snap = snapshot(r)
+        assert snap is not r
+        assert snap.items == r.items and snap.items is not r.items
+        assert policy_for(SubRecord) == 'deep'
+        with pytest.raises(ValueError):
+            copy_policy(Record, 'clone')
+    finally:
+        copy_policy(Record, 'ref')
+    assert snapshot(r) is r
+
+
+def test_Deferred():
+    calls = []
+    def render():
+        calls.append(1)
+        return 'rendered\n'
+    d = Deferred(render)
+    assert d() == 'rendered\n'
+    assert d() == 'rendered\n'
+    assert calls == [1]
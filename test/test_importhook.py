@@ -0,0 +1,196 @@
+import sys
+import ast
+import random
+import string
+import linecache
+import pytest
+from textdata import textlines
+
+if sys.version_info[0] < 3:
+    pytest.skip('import hook requires Python 3', allow_module_level=True)
+
+from show.importhook import *
+from show.introspect import CallIndex
+
+# --- TEST FIXTURES ---
+
+ALPHABET = string.ascii_lowercase
+
+@pytest.fixture
+def package(tmpdir):
+    """
+    Make a uniquely-named, importable, empty package. Returns its name and
+    directory.
+    """
+    name = 'showpkg_' + ''.join(random.choice(ALPHABET) for i in range(8))
+    pkgdir = tmpdir.mkdir(name)
+    pkgdir.join('__init__.py').write('')
+    sys.path.insert(0, tmpdir.strpath)
+    yield name, pkgdir
+    sys.path.remove(tmpdir.strpath)
+    uninstall()
+    for modname in list(sys.modules):
+        if modname.startswith(name):
+            del sys.modules[modname]
+
+# --- END TEST FIXTURES ---
+
+MODULE = """
+    from show import Show
+    show = Show(where=False, retvalue=True)
+    dbg = show.clone()
+
+    def f(x, y):
+        return show(x, y), dbg(y), show.items([x])
+"""
+
+
+def forget_source(path):
+    """
+    Overwrite a module's source and flush caches of it, so that any runtime
+    introspection would fail to find argument names.
+    """
+    open(path, 'w').write('\n' * 20)
+    linecache.clearcache()
+    CallIndex._indexes.pop(path, None)
+
+
+def test_NamingTransformer():
+    tree = ast.parse(textlines("""
+        another = show.clone()
+        show(a, b)
+        another.props(c)
+        show(*args)
+        print(d)
+    """))
+    tree = NamingTransformer().visit(tree)
+    calls = [n.value for n in tree.body[1:]]
+    argnames = [[kw for kw in c.keywords if kw.arg == '_argnames'] for c in calls]
+    assert [len(a) for a in argnames] == [1, 1, 0, 0]
+    assert [getattr(e, 's', getattr(e, 'value', None)) for e in argnames[0][0].value.elts] == ['a', 'b']
+
+
+def test_install(package):
+    name, pkgdir = package
+    modpath = pkgdir.join('mod.py')
+    modpath.write(textlines(MODULE))
+
+    finder = install(name)
+    assert finder in sys.meta_path
+    mod = __import__(name + '.mod', fromlist=['f'])
+    forget_source(modpath.strpath)
+
+    assert mod.f(1, 2) == ('x: 1  y: 2', 'y: 2', '[x] (1 item): [1]')
+
+    uninstall(finder)
+    assert finder not in sys.meta_path
+
+
+def test_not_installed(package):
+    name, pkgdir = package
+    modpath = pkgdir.join('plain.py')
+    modpath.write(textlines(MODULE))
+
+    install(name + '.other')
+    mod = __import__(name + '.plain', fromlist=['f'])
+    forget_source(modpath.strpath)
+
+    assert mod.f(1, 2)[0] != 'x: 1  y: 2'
+
+
+STRIPPED_MODULE = """
+    from show import Show
+    show = Show(where=False, retvalue=True)
+    evaluated = []
+
+    def noisy(x):
+        evaluated.append(x)
+        return x
+
+    @show.inout(only='in')
+    def f(x):
+        show(noisy(x))
+        show.items([noisy(x)])
+        return show(noisy(x)), x
+"""
+
+
+def test_strip(package):
+    name, pkgdir = package
+    pkgdir.join('stripped.py').write(textlines(STRIPPED_MODULE))
+
+    strip(name)
+    mod = __import__(name + '.stripped', fromlist=['f'])
+
+    assert mod.f(1) == (None, 1)
+    assert mod.evaluated == []
+    assert 'show' not in mod.f.__wrapped__.__code__.co_names
+    assert hasattr(mod.f, '__wrapped__')    # decorator retained
+
+
+def test_install_from_environ(package):
+    name, pkgdir = package
+    finders = install_from_environ({'SHOW_STRIP': name + ', other'})
+    assert len(finders) == 1
+    assert finders[0].transformer is StrippingTransformer
+    assert finders[0].packages == (name, 'other')
+
+    assert install_from_environ({}) == []
+
+
+def test_strip_operator_forms():
+    tree = ast.parse(textlines("""
+        show > a
+        show >> b
+        c = (show > d, x > y)
+    """))
+    tree = StrippingTransformer(bases=['show']).visit(tree)
+    assert [type(n).__name__ for n in tree.body[:2]] == ['Pass', 'Pass']
+    elts = tree.body[2].value.elts
+    assert getattr(elts[0], 'value', None) is None
+    assert type(elts[0]).__name__ in ('Constant', 'NameConstant')
+    assert isinstance(elts[1], ast.Compare)
+
+
+HOT_INIT = """
+    import sys
+    from show import show
+    show.say.setfiles([sys.stderr])
+    show('init', 1)
+"""
+
+HOT_APP = """
+    from show import show
+    show('app', 2)
+"""
+
+HOT_SCRIPT = """
+    import sys
+    from show import show
+    show.say.setfiles([sys.stderr])
+    show('script', sys.argv[1:])
+"""
+
+
+def test_run_strips_everything(package):
+    import os
+    import subprocess
+    name, pkgdir = package
+    pkgdir.join('__init__.py').write(textlines(HOT_INIT))
+    pkgdir.join('app.py').write(textlines(HOT_APP))
+    script = pkgdir.dirpath().join('hotscript.py')
+    script.write(textlines(HOT_SCRIPT))
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def run(args, strip):
+        env = dict(os.environ, SHOW_STRIP=strip, PYTHONIOENCODING='UTF-8',
+                   PYTHONPATH=os.pathsep.join([root, pkgdir.dirpath().strpath]))
+        return subprocess.check_output([sys.executable, '-m', 'show', 'run'] + args,
+                                       env=env, cwd=pkgdir.dirpath().strpath,
+                                       stderr=subprocess.STDOUT).decode('utf-8')
+
+    out = run(['-m', name + '.app'], 'other')
+    assert 'init' in out and 'app' in out
+    assert run(['-m', name + '.app'], name) == ''
+    assert 'script' in run([script.strpath, 'a'], 'other')
+    assert run([script.strpath, 'a'], 'hotscript') == ''
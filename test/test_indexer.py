@@ -0,0 +1,119 @@
+import io
+import json
+from textdata import textlines
+from show.indexer import *
+from show import Show
+from show.introspect import CallArgs, invalidate
+from show.diskcache import SidecarIndex
+
+
+def make_tree(tmpdir):
+    """
+    Make a small source tree: a package with a clone-using module, a plain
+    module, and an unparseable one.
+    """
+    src = tmpdir.mkdir('src')
+    pkg = src.mkdir('pkg')
+    pkg.join('__init__.py').write('')
+    pkg.join('mod.py').write(textlines("""
+        from show import show
+        trace = show.clone()
+        def f(x, y):
+            show(x, y)
+            trace(y)
+    """))
+    src.join('top.py').write(textlines("""
+        import pkg
+        pkg.extra(a)
+        show.items(b)
+    """))
+    src.join('bad.py').write('def (:\n')
+    return src
+
+
+def test_build_index(tmpdir):
+    src = make_tree(tmpdir)
+    for jobs in (1, 2):
+        index = build_index([src.strpath], names=['pkg.extra'], jobs=jobs)
+        files = index['files']
+        assert sorted(files) == ['pkg/mod.py', 'top.py']
+        assert files['pkg/mod.py'] == {'4': ['x', 'y'], '5': ['y'],
+                                       '4:4': ['show', ['x', 'y']],
+                                       '5:4': ['trace', ['y']]}
+        assert files['top.py'] == {'2': ['a'], '3': ['b'],
+                                   '2:0': ['pkg.extra', ['a']],
+                                   '3:0': ['show.items', ['b']]}
+
+
+def test_cli_and_sidecar(tmpdir):
+    src = make_tree(tmpdir)
+    output = tmpdir.join('index.json').strpath
+    assert main(['index', src.strpath, '-o', output, '-j', '1']) == 0
+    assert json.load(open(output))['version'] == 2
+
+    sidecar = SidecarIndex([output])
+    # matched by path tail, wherever the code is deployed without source
+    assert sidecar.get('/deploy/app.pyz/pkg/mod.py', 4) == ['x', 'y']
+    assert sidecar.get('pkg/mod.py', 5) == ['y']
+    assert sidecar.get('/deploy/other/mod.py', 4) is None
+    assert sidecar.get('/deploy/pkg/mod.py', 3) is None
+    # but a bare file name is too loose a match
+    assert sidecar.get('/deploy/top.py', 3) is None
+
+    # where the source is present, only if it is what was indexed
+    top, mod = src.join('top.py'), src.join('pkg', 'mod.py')
+    assert sidecar.get(top.strpath, 3) == ['b']
+    mod.write(mod.read().replace('show(x, y)', 'show(x, z)'))
+    assert SidecarIndex([output]).get(mod.strpath, 4) is None
+
+    CallArgs.use_index(output)
+    try:
+        assert CallArgs('/no/such/source/pkg/mod.py', 5).args == ['y']
+        assert CallArgs(mod.strpath, 4).args == ['x', 'z']
+    finally:
+        CallArgs.use_index()
+    assert CallArgs.sidecar is None
+    assert CallArgs('/no/such/source/pkg/mod.py', 5).args != ['y']
+
+
+def test_show_with_index_and_disk_cache(tmpdir):
+    src = tmpdir.mkdir('src')
+    p = src.mkdir('pkg').join('mod.py')
+    p.write(textlines("""
+        def func(x, y):
+            a = show(x)
+            return a, show(y)
+    """))
+    s = Show(where=False, retvalue=True)
+    s.say.setfiles([io.StringIO()])
+    ns = {'show': s}
+    exec(compile(p.read(), p.strpath, 'exec'), ns)
+    cachedir = tmpdir.join('cache')
+    indexpath = tmpdir.join('index.json').strpath
+
+    # names resolved by the show call are stored in the disk cache
+    CallArgs.use_disk_cache(cachedir.strpath)
+    try:
+        invalidate()
+        assert ns['func'](1, 2) == ('x: 1', 'y: 2')
+        CallArgs.disk_cache.flush()
+        records = [json.load(open(f.strpath)) for f in cachedir.listdir()]
+        assert [r['path'] for r in records] == [p.strpath]
+        assert records[0]['lines']
+
+        # and the sidecar index takes precedence over both cache and source
+        index = build_index([src.strpath], jobs=1)
+        lines = index['files']['pkg/mod.py']
+        for key, entry in lines.items():
+            if ':' in key:
+                entry[1] = ['i' + name for name in entry[1]]
+            else:
+                lines[key] = ['i' + name for name in entry]
+        write_index(index, indexpath)
+        CallArgs.use_index(indexpath)
+        invalidate()
+        assert ns['func'](1, 2) == ('ix: 1', 'iy: 2')
+    finally:
+        CallArgs.use_index()
+        CallArgs.use_disk_cache(None)
+        invalidate()
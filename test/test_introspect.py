@@ -1,5 +1,6 @@
 
-import os, random, string
+import os, random, string, ast
+import pytest
 from textdata import lines, textlines
 
 # --- TEST FIXTURES ---
@@ -20,6 +21,7 @@ def tempfile(text, tmpdir):
 # --- END TEST FIXTURES ---
 
 from show.introspect import *
+from show.diskcache import ArgCache
 
 CallArgs.add_target_func('show')
 
@@ -65,6 +67,35 @@ def test_callargs_four(tmpdir):
     assert CallArgs(p.strpath, 5).args == ['y', 'x']
 
 
+def test_CallIndex(tmpdir):
+    p = tempfile("""
+        def func(x, y):
+            show(x,
+                 y)
+            z = [show > x,
+                 show >> y]
+            index_only_target(y)
+            return show.items(x)
+    """, tmpdir=tmpdir)
+
+    index = CallIndex.for_file(p.strpath)
+    assert CallIndex.for_file(p.strpath) is index
+    assert index.get(1) is None
+    assert index.get(2) == ['x', 'y']
+    assert index.get(3) == ['x', 'y']
+    assert index.get(4) == ['x']
+    assert index.get(5) == ['y']
+    assert index.get(6) is None
+    assert index.get(7) == ['x']
+    assert CallArgs(p.strpath, 3).args == ['x', 'y']
+
+    # new target names (e.g. from clones) cause reindexing
+    CallArgs.add_target_func('index_only_target')
+    reindex = CallIndex.for_file(p.strpath)
+    assert reindex is not index
+    assert reindex.get(6) == ['y']
+
+
 def test_ClassProps():
     c = ClassProps(dict)
     assert 'keys' in c.props
@@ -87,3 +118,142 @@ def test_class_props():
     cps = class_props(Slotted)
     assert 'a' in cps
     assert 'b' in cps
+
+
+def test_ArgCache(tmpdir):
+    p = tempfile("""
+        def func():
+            x = 12
+            show(x)
+    """, tmpdir=tmpdir)
+    cachedir = tmpdir.join('cache').strpath
+
+    cache = ArgCache(cachedir)
+    assert cache.get(p.strpath, 3) is None
+    cache.put(p.strpath, 3, ['x'])
+    assert cache.get(p.strpath, 3) == ['x']
+
+    # a fresh instance, as in another process, sees what was flushed
+    assert ArgCache(cachedir).get(p.strpath, 3) is None
+    cache.flush()
+    other = ArgCache(cachedir)
+    assert other.get(p.strpath, 3) == ['x']
+    other.put(p.strpath, 4, ['y'])
+    other.flush()
+    assert ArgCache(cachedir).get(p.strpath, 3) == ['x']
+    assert ArgCache(cachedir).get(p.strpath, 4) == ['y']
+
+    # changing the source invalidates its entries
+    p.write(textlines("""
+        def func():
+            x, y = 12, 13
+            show(y)
+    """))
+    assert other.get(p.strpath, 3) is None
+    assert ArgCache(cachedir).get(p.strpath, 3) is None
+
+    # pseudo-files are never cached
+    cache.put('<stdin>', 1, ['x'])
+    assert cache.get('<stdin>', 1) is None
+
+
+def test_callargs_disk_cache(tmpdir):
+    p = tempfile("""
+        def func():
+            x = 12
+            show(x)
+    """, tmpdir=tmpdir)
+    cachedir = tmpdir.join('cache').strpath
+
+    CallArgs.use_disk_cache(cachedir)
+    try:
+        assert CallArgs(p.strpath, 3).args == ['x']
+    finally:
+        CallArgs.use_disk_cache(None)
+    assert ArgCache(cachedir).get(p.strpath, 3) == ['x']
+    assert CallArgs.disk_cache is None
+
+
+def resolve_args(site):
+    return CallArgs(*site).args
+
+
+def test_disk_cache_pool_workers(tmpdir):
+    import multiprocessing
+    p = tempfile("""
+        def func():
+            x = 12
+            show(x)
+    """, tmpdir=tmpdir)
+    cachedir = tmpdir.join('cache').strpath
+
+    # workers exit without running atexit handlers, yet their entries persist
+    CallArgs.use_disk_cache(cachedir)
+    try:
+        pool = multiprocessing.Pool(2)
+        assert pool.map(resolve_args, [(p.strpath, 3)]) == [['x']]
+        pool.close()
+        pool.join()
+        assert ArgCache(cachedir).get(p.strpath, 3) == ['x']
+    finally:
+        CallArgs.use_disk_cache(None)
+
+
+def test_limit_caches():
+    class Gadget(object):
+        pass
+
+    before = cache_stats()
+    assert set(before) == set(['CallArgs', 'ClassProps', 'CallIndex', 'positions',
+                               'reprs'])
+    assert before['ClassProps']['maxsize'] is None
+
+    try:
+        limit_caches(None, ClassProps=2)
+        assert ClassProps(Gadget) is ClassProps(Gadget)
+        stats = cache_stats()['ClassProps']
+        assert stats['size'] <= 2
+        assert stats['evictions'] > before['ClassProps']['evictions']
+        assert stats['hits'] > before['ClassProps']['hits']
+        with pytest.raises(TypeError):
+            limit_caches(1, Classprops=2)
+        assert cache_stats()['ClassProps']['maxsize'] == 2     # unchanged
+        assert cache_stats()['CallArgs']['maxsize'] is None
+    finally:
+        limit_caches(None, reprs=before['reprs']['maxsize'])
+    assert cache_stats()['ClassProps']['maxsize'] is None
+
+
+def test_SourceText():
+    source = textlines("""
+        show(x+1, naïve['ключ'] ,  f( y ))
+        show(
+            a,
+            [b,
+             c])
+    """)
+    text = SourceText(source)
+    tree = ast.parse(source)
+    args = tree.body[0].value.args + tree.body[1].value.args
+    found = [arg_source(arg, text) for arg in args]
+    if HAS_END_POSITIONS:
+        assert found[:4] == ["x+1", "naïve['ключ']", "f( y )", "a"]
+    assert found[4] == to_source(args[4])   # spans lines, so regenerated
+    assert SourceText(source.encode('utf-8')).segment(args[1]) == text.segment(args[1])
+    assert SourceText('').segment(args[0]) is None
+
+
+def test_invalidate_forgets_args(tmpdir):
+    p = tempfile("""
+        def func():
+            show(first)
+    """, tmpdir)
+    path = p.strpath
+    assert CallArgs(path, 2).args == ['first']
+    p.write(textlines("""
+        def func():
+            show(second)
+    """))
+    assert CallArgs(path, 2).args == ['first']
+    invalidate(path)
+    assert CallArgs(path, 2).args == ['second']
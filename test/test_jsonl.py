@@ -0,0 +1,70 @@
+
+import io
+import os
+import json
+import threading
+from show.jsonl import *
+from show import show
+
+
+def test_dumps():
+    record = {'name': 'x', 'repr': u'naïve', 'n': 1, 'odd': object}
+    text = dumps(record)
+    assert '\n' not in text
+    back = json.loads(text)
+    assert back['repr'] == u'naïve'
+    assert back['n'] == 1
+    assert back['odd'] == repr(object)
+
+
+def test_arg_entry():
+    assert arg_entry('x', 12) == {'name': 'x', 'type': 'int', 'repr': '12'}
+    assert arg_entry('d', {'a': 1})['type'] == 'dict'
+
+
+def test_show_jsonl():
+    out = io.StringIO()
+    s = show.clone(jsonl=True, where=False)
+    s.say.setfiles([out])
+    x = 12
+    name = 'Joe'
+    s(x, name, 'hi {name}')
+    line = out.getvalue()
+    assert line.endswith('\n') and line.count('\n') == 1
+    rec = json.loads(line)
+    assert rec['args'][:2] == [
+        {'name': 'x', 'type': 'int', 'repr': '12'},
+        {'name': 'name', 'type': 'str', 'repr': "'Joe'"},
+    ]
+    quoted = rec['args'][2]
+    assert 'hi {name}' in quoted['name']    # quoting style varies by codegen
+    assert quoted['repr'] == 'hi Joe'
+    assert rec['func'] == 'test_show_jsonl'
+    assert rec['file'].endswith('test_jsonl.py')
+    assert rec['where'].startswith('test_show_jsonl():')
+    assert rec['pid'] == os.getpid()
+    assert rec['tid'] == threading.current_thread().ident
+    assert isinstance(rec['ts'], float)
+
+
+def test_show_jsonl_deferred():
+    out = io.StringIO()
+    s = show.clone(jsonl=True)
+    s.say.setfiles([out])
+    sink = s.use_sink(defer=True)
+    items = [1]
+    s(items)
+    items.append(2)
+    s(items)
+    sink.flush()
+    recs = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r['args'][0]['repr'] for r in recs] == ['[1]', '[1, 2]']
+    sink.close()
+
+
+def test_show_jsonl_retvalue():
+    out = io.StringIO()
+    s = show.clone(jsonl=True, retvalue=True)
+    s.say.setfiles([out])
+    x = 1
+    assert json.loads(s(x))['args'][0]['name'] == 'x'
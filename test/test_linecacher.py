@@ -1,4 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import linecache
+import pytest
+import show.linecacher as lc
+from show.linecacher import CellLines, LineBuffer, checkcache, invalidate, on_invalidate
 
 # Where to even begin? I'm sure it's testable at some level,
 # but *so* much interactive behavior and platform-specific
-# behavior to navigate!
\ No newline at end of file
+# behavior to navigate!
+
+
+def test_checkcache_throttled(tmpdir, monkeypatch):
+    p = tmpdir.join('mod.py')
+    p.write('x = 1\n')
+    path = p.strpath
+    clock = [100.0]
+    monkeypatch.setattr(lc, '_clock', lambda: clock[0])
+    monkeypatch.setattr(lc, 'CHECK_INTERVAL', 5.0)
+    seen = []
+    monkeypatch.setattr(lc, '_listeners', [seen.append])
+
+    invalidate(path)
+    del seen[:]
+    assert linecache.getline(path, 1) == 'x = 1\n'
+    checkcache(path)
+
+    p.write('x = 22\n')
+    clock[0] += 1
+    checkcache(path)        # too soon; not checked
+    assert linecache.getline(path, 1) == 'x = 1\n'
+    assert seen == []
+
+    clock[0] += 5
+    checkcache(path)        # checked, found changed
+    assert linecache.getline(path, 1) == 'x = 22\n'
+    assert seen == [path]
+
+
+def test_invalidate(tmpdir, monkeypatch):
+    p = tmpdir.join('mod.py')
+    p.write('y = 1\n')
+    path = p.strpath
+    monkeypatch.setattr(lc, 'CHECK_INTERVAL', 1000.0)
+    seen = []
+    monkeypatch.setattr(lc, '_listeners', [])
+    listener = seen.append
+    assert on_invalidate(listener) is listener
+
+    assert linecache.getline(path, 1) == 'y = 1\n'
+    checkcache(path)
+    p.write('y = 333\n')
+    checkcache(path)
+    assert linecache.getline(path, 1) == 'y = 1\n'
+
+    invalidate(path)
+    assert linecache.getline(path, 1) == 'y = 333\n'
+    invalidate()
+    assert seen == [path, None]
+
+
+def test_CellLines():
+    ih = ['', 'a = 1\nshow(a)\n', 'b = 2\r\nshow(b)']
+    cl = CellLines(maxcells=2)
+    lines = cl.get(ih, 1)
+    assert lines == ['a = 1\n', 'show(a)\n']
+    assert cl.get(ih, 1) is lines
+    assert cl.get(ih, 2) == ['b = 2\r\n', 'show(b)']
+
+    ih[1] = 'a = 11\nshow(a)\n'      # cell re-executed with new text
+    assert cl.get(ih, 1) == ['a = 11\n', 'show(a)\n']
+
+    ih.append('c = 3')
+    cl.get(ih, 3)
+    assert len(cl.cells) == 2
+    assert cl.cells.evictions == 1
+
+
+def test_LineBuffer():
+    b = LineBuffer()
+    b.append('one')
+    b.append('two\nthree')
+    b.append('')
+    b.append('naïve ünïcode')
+    assert len(b) == 5
+    assert [b[i] for i in range(5)] == ['one', 'two', 'three', '', 'naïve ünïcode']
+    assert b[-1] == 'naïve ünïcode'
+    assert b[-5] == 'one'
+    with pytest.raises(IndexError):
+        b[5]
+    with pytest.raises(IndexError):
+        b[-6]
+
+    b.clear()
+    assert len(b) == 0
+    b.append('again')
+    assert b[0] == 'again'
+
+
+def test_LineBuffer_capped():
+    b = LineBuffer(maxlines=8)
+    for i in range(100):
+        b.append('line {0}'.format(i))
+        assert b.retained <= 8
+    assert len(b) == 100
+    assert b[99] == b[-1] == 'line 99'
+    assert b[-b.retained] == 'line {0}'.format(100 - b.retained)
+    with pytest.raises(IndexError):
+        b[0]
@@ -0,0 +1,142 @@
+
+import io
+import os
+import sys
+import time
+import signal
+import threading
+import pytest
+from show import show, Show
+from show.recorder import FlightRecorder
+
+
+def test_FlightRecorder():
+    rec = FlightRecorder(size=4)
+    for i in range(3):
+        rec.write('r{0}\n'.format(i))
+    assert len(rec) == 3
+    assert rec.records() == ['r0\n', 'r1\n', 'r2\n']
+    for i in range(3, 10):
+        rec.write('r{0}\n'.format(i))
+    assert rec.records() == ['r6\n', 'r7\n', 'r8\n', 'r9\n']
+    assert rec.records() == ['r6\n', 'r7\n', 'r8\n', 'r9\n']     # looking is free
+    rec.write(lambda: 'deferred\n')
+    out = io.StringIO()
+    assert rec.dump(out) == 4
+    assert out.getvalue().splitlines()[1:-1] == ['r7', 'r8', 'r9', 'deferred']
+    assert len(rec) == 0
+    out = io.StringIO()
+    rec.write('after\n')
+    assert rec.dump(out) == 1
+    assert out.getvalue().splitlines()[1:-1] == ['after']
+
+
+def test_FlightRecorder_bad_size():
+    with pytest.raises(ValueError):
+        FlightRecorder(size=0)
+
+
+def test_use_recorder():
+    out = io.StringIO()
+    s = show.clone(where=False)
+    rec = s.use_recorder(size=10, file=out, install=False, defer=True)
+    items = [1]
+    s(items)
+    items.append(2)     # after the call; not seen in the dump
+    assert out.getvalue() == ''
+    rec.dump()
+    assert out.getvalue().splitlines()[1:-1] == ['items: [1]']
+
+
+def test_recorder_excepthook():
+    out = io.StringIO()
+    called = []
+    prior = sys.excepthook
+    sys.excepthook = lambda *args: called.append(args[0])
+    try:
+        rec = FlightRecorder(size=5, file=out).install(signum=None)
+        rec.write('before the crash\n')
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            sys.excepthook(*sys.exc_info())
+        rec.uninstall()
+        assert 'before the crash' in out.getvalue()
+        assert called == [ValueError]
+    finally:
+        sys.excepthook = prior
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGUSR1'), reason='needs SIGUSR1')
+def test_recorder_signal():
+    out = io.StringIO()
+    rec = FlightRecorder(size=5, file=out).install(excepthook=False)
+    lock = threading.Lock()
+
+    def render():
+        # as rendering might take a lock the interrupted thread holds
+        if not lock.acquire(timeout=2):
+            return 'timed out\n'
+        lock.release()
+        return 'rendered\n'
+
+    try:
+        rec.write('on signal\n')
+        rec.write(render)
+        with lock:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            time.sleep(0.1)
+        deadline = time.time() + 5
+        while 'end of show' not in out.getvalue() and time.time() < deadline:
+            time.sleep(0.01)
+        assert out.getvalue().splitlines()[1:-1] == ['on signal', 'rendered']
+    finally:
+        rec.uninstall()
+    assert signal.getsignal(signal.SIGUSR1) == signal.SIG_DFL
+
+
+def test_use_recorder_in_thread():
+    s = Show(where=False)
+    prior_hook, prior_signal = sys.excepthook, signal.getsignal(signal.SIGINT)
+    recorders = []
+
+    def worker():
+        recorders.append(s.use_recorder(size=5))
+        recorders.append(FlightRecorder(size=5).install(signum=signal.SIGINT))
+
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join()
+    try:
+        assert len(recorders) == 2
+        assert recorders[1]._hooks and 'signal' not in recorders[1]._hooks
+        assert sys.excepthook == recorders[1]._excepthook
+        assert signal.getsignal(signal.SIGINT) == prior_signal
+    finally:
+        for rec in reversed(recorders):
+            rec.uninstall()
+    assert sys.excepthook == prior_hook
+
+
+@pytest.mark.parametrize('jsonl', [False, True])
+def test_deferred_keeps_no_frame(jsonl):
+    import gc
+    import weakref
+    out = io.StringIO()
+    show = Show(where=True, jsonl=jsonl)
+    rec = show.use_recorder(size=10, file=out, install=False, defer=True)
+
+    class Bulky(object):
+        pass
+
+    def f():
+        bulky = Bulky()
+        x = 1
+        show(x, 'bulky is {bulky!r:.2}')
+        return weakref.ref(bulky)
+
+    ref = f()
+    gc.collect()
+    assert ref() is None        # the frame's locals were not kept
+    rec.dump()
+    assert 'x' in out.getvalue() and 'f()' in out.getvalue()
@@ -34,3 +34,152 @@ def test_ReprStr():
     assert ReprStr('1') == '1'
     assert ReprStr(ReprStr('1')) == '1'
     assert ','.join([ReprStr('1'), ReprStr('2')]) == '1,2'
+
+
+def test_bounded_repr():
+    assert bounded_repr([1, 2, 3]) == '[1, 2, 3]'
+    assert bounded_repr((1,)) == '(1,)'
+    assert bounded_repr({'b': 2, 'a': [1, {}]}) == "{'a': [1, {}], 'b': 2}"
+    assert bounded_repr(list(range(10)), maxitems=3) == '[0, 1, 2, ... (7 more)]'
+    assert bounded_repr(list(range(100)), maxlen=10) == '[0, 1, 2, ...'
+    assert bounded_repr('x' * 100, maxlen=5) == "'xxxx..."
+    assert bounded_repr([[[1]]], depth=2) == '[[[...]]]'
+    a = [1]
+    a.append(a)
+    assert bounded_repr(a).startswith('[1, <Recursion on list with id=')
+
+
+def test_bounded_repr_huge():
+    big = list(range(10 ** 6))
+    assert exceeds(big)
+    r = bounded_repr(big, maxlen=50, maxitems=10)
+    assert r == '[0, 1, 2, 3, 4, 5, 6, 7, 8, 9, ... (999,990 more)]'
+    d = dict((i, i) for i in range(5000, 0, -1))
+    assert bounded_repr(d, maxlen=20).startswith('{5000: 5000, 4999:')  # unsorted
+
+
+def test_bounded_repr_other_containers():
+    import array
+    import collections
+
+    class Noisy(dict):
+        def __repr__(self):
+            raise AssertionError('own repr called')
+
+    assert bounded_repr(collections.deque([1, 2])) == 'deque([1, 2])'
+    assert bounded_repr(collections.deque(range(10), maxlen=10), maxitems=2) == \
+        'deque([0, 1, ... (8 more)], maxlen=10)'
+    assert bounded_repr(array.array('i', range(10)), maxitems=2) == \
+        "array('i', [0, 1, ... (8 more)])"
+    big = Noisy((i, i) for i in range(10))
+    assert exceeds(big, maxitems=5)
+    assert bounded_repr(big, maxitems=2) == 'Noisy({0: 0, 1: 1, ... (8 more)})'
+    assert exceeds(collections.deque(range(10 ** 6)))
+    assert exceeds(array.array('d', range(10 ** 6)))
+
+
+def test_exceeds():
+    assert not exceeds([1, 2, 3])
+    assert exceeds(list(range(11)), maxitems=10)
+    assert exceeds([list(range(9))] * 9, maxlen=60, maxitems=10)
+    assert exceeds('x' * 11, maxlen=10)
+
+
+def test_default_repr_bounds():
+    class Opts(object):
+        maxlen = 30
+        maxitems = 5
+        wrap = None
+    assert default_repr([1, 2]) == '[1, 2]'
+    assert default_repr(list(range(10)), Opts()) == '[0, 1, 2, 3, 4, ... (5 more)]'
+
+
+class Money(float):
+    pass
+
+
+def test_repr_dispatch_mro():
+    class Opts(object):
+        digits = 2
+    assert get_repr(Money(1.5), Opts()) == '1.5'    # float's repr, via MRO
+
+    class Base(object):
+        pass
+
+    class Derived(Base):
+        pass
+
+    register_repr(Base, lambda v: 'a base')
+    try:
+        assert get_repr(Derived()) == 'a base'
+        register_repr(Derived, lambda v: 'derived')
+        assert get_repr(Derived()) == 'derived'     # cached choice forgotten
+    finally:
+        repr_types.clear()
+    assert get_repr(Derived()).startswith('<')
+
+
+def test_repr_dispatch_bounded():
+    from show.repr import _dispatch
+    maxsize = _dispatch.maxsize
+    assert maxsize is not None
+    _dispatch.resize(3)
+    try:
+        for i in range(10):
+            Made = type('Made{0}'.format(i), (object,), {})
+            assert get_repr(Made()).startswith('<')
+        stats = _dispatch.stats()
+        assert stats['size'] <= 3
+        assert stats['evictions'] > 0
+    finally:
+        _dispatch.resize(maxsize)
+
+
+def test_repr_dispatch_by_name():
+    name = type_longname(Money(0))
+    repr_lookup[name] = lambda v, opts=None: 'money'
+    try:
+        assert get_repr(Money(2)) == 'money'
+    finally:
+        del repr_lookup[name]
+
+    class Opts(object):
+        digits = 2
+    assert get_repr(Money(2), Opts()) == '2.'
+
+
+def test_np_repr():
+    np = pytest.importorskip('numpy')
+
+    class Opts(object):
+        digits = 2
+        maxitems = 10
+        edgeitems = 2
+
+    before = np.get_printoptions()
+    assert np_repr(np.array([1.23456, 2.5]), Opts()) == '[1.23 2.5 ]'
+    assert np_repr(np.arange(100), Opts()) == '[ 0  1 ... 98 99]'
+    assert np.get_printoptions() == before
+
+    class Sub(np.ndarray):
+        pass
+    assert get_repr(np.arange(3).view(Sub), Opts()) == '[0 1 2]'
+
+
+def test_pd_repr():
+    pd = pytest.importorskip('pandas')
+
+    class Opts(object):
+        digits = 2
+
+    before = pd.get_option('display.float_format')
+    df = pd.DataFrame({'x': [1.23456, 2.5], 'n': [1, 2]})
+    r = pd_repr(df, Opts())
+    assert '1.23' in r and '2.50' in r and '1.2345' not in r
+    assert pd.get_option('display.float_format') == before
+
+    assert get_repr(df, Opts()) == r
+    s = pd.Series([0.5] * 10 ** 6, name='s')
+    lines = get_repr(s, Opts()).splitlines()
+    assert len(lines) < 20
+    assert lines[-1] == 'Name: s, Length: 1000000, dtype: float64'
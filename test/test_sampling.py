@@ -0,0 +1,65 @@
+
+import io
+import json
+from show.sampling import *
+from show import show
+
+
+def test_every():
+    s = Sampler()
+    results = [s.admit('site', every=3) for i in range(7)]
+    assert results == [(True, 0), (False, 0), (False, 0), (True, 2),
+                       (False, 0), (False, 0), (True, 2)]
+    assert s.admit('other', every=3) == (True, 0)
+
+
+def test_sample():
+    draws = iter([0.1, 0.9, 0.8, 0.2])
+    s = Sampler(random=lambda: next(draws))
+    results = [s.admit('site', sample=0.5) for i in range(4)]
+    assert results == [(True, 0), (False, 0), (False, 0), (True, 2)]
+
+
+def test_rate():
+    now = [0.0]
+    s = Sampler(clock=lambda: now[0])
+    # burst of 2, then limited to 1 per second
+    assert [s.admit('site', rate=1, burst=2)[0] for i in range(4)] == \
+           [True, True, False, False]
+    now[0] += 1.0
+    assert s.admit('site', rate=1, burst=2) == (True, 2)
+    assert s.admit('site', rate=1, burst=2) == (False, 0)
+
+
+def test_maxsites():
+    s = Sampler(maxsites=2)
+    for site in 'abc':
+        s.admit(site, every=2)
+    assert len(s.sites) == 2
+
+
+def test_suppressed_note():
+    assert suppressed_note(1204) == '(1,204 suppressed)'
+
+
+def test_show_every():
+    out = io.StringIO()
+    s = show.clone(where=False)
+    s.say.setfiles([out])
+    for i in range(7):
+        s(i, every=3)
+    assert out.getvalue().splitlines() == [
+        'i: 0', 'i: 3  (2 suppressed)', 'i: 6  (2 suppressed)'
+    ]
+
+
+def test_show_every_jsonl():
+    out = io.StringIO()
+    s = show.clone(jsonl=True, every=2)
+    s.say.setfiles([out])
+    for i in range(3):
+        s(i)
+    recs = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r['args'][0]['repr'] for r in recs] == ['0', '2']
+    assert 'suppressed' not in recs[0]
+    assert recs[1]['suppressed'] == 1
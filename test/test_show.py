@@ -2,7 +2,9 @@
 import pytest
 from show import Show, NoShow, noshow
 from show.exceptions import BadValue
+from show.introspect import HAS_POSITIONS, HAS_END_POSITIONS
 import sys
+import io
 import platform
 import six
 import re
@@ -55,20 +57,28 @@ def test_clone(param = 'Yo'):
                 "len(c): 15  c: 'something else!'"
 
 
-def test_literals():
-    # codegen only, not astor
-    # assert show(1 + 1) == '1 + 1: 2'
-    # assert show(1+1) == '1 + 1: 2'
+@pytest.mark.skipif(not HAS_POSITIONS, reason="needs Python 3.11+ code positions")
+def test_same_line_calls():
+    a = 1
+    b = 3.141
+
+    assert [show(a), show(b)] == ['a: 1', 'b: 3.141']
+    assert show(a) + show(b, a) == 'a: 1b: 3.141  a: 1'
 
-    # for when using astor as codegen replacement
-    assert show(1 + 1) == '(1 + 1): 2'
-    assert show(1+1) == '(1 + 1): 2'
 
-    # NB output may have more or fewer spaces than actual parameter, based on codegen.to_source()
-    # creating its 'idealized' code output
+def test_literals():
+    if HAS_END_POSITIONS:
+        # original source text, sliced out exactly
+        assert show(1 + 1) == '1 + 1: 2'
+        assert show(1+1) == '1+1: 2'
+    else:
+        # for when using astor as codegen replacement
+        assert show(1 + 1) == '(1 + 1): 2'
+        assert show(1+1) == '(1 + 1): 2'
 
-    # when we were using codegen to recreate source, it did so without parenthesis
-    # astor uses parens -- which seem superflous here...but printing literals isn't
+    # NB astor output may have more or fewer spaces than actual parameter,
+    # based on to_source() creating its 'idealized' code output. It also uses
+    # parens -- which seem superflous here...but printing literals isn't
     # the main use case, so whatever...
 
 def test_say_params():
@@ -749,3 +759,92 @@ def test_settings_noshow(capsys):
         out, err = capsys.readouterr()
         assert out == ""
         assert err == ""
+
+
+def test_flat_options_invalidated():
+    show = Show(where=False, retvalue=True)
+    show.say.setfiles([io.StringIO()])
+    x = 1
+    assert show(x) == 'x: 1'
+    show.set(sep=' | ')
+    assert show(x, x) == 'x: 1 | x: 1'
+    with show.settings(sep=', '):
+        assert show(x, x) == 'x: 1, x: 1'
+    assert show(x, x) == 'x: 1 | x: 1'
+
+    # clones see their parents' changes
+    c = show.clone()
+    c.say.setfiles([io.StringIO()])
+    assert c(x, x) == 'x: 1 | x: 1'
+    show.set(sep='; ')
+    assert c(x, x) == 'x: 1; x: 1'
+
+
+def test_fast_path_precompiled(monkeypatch):
+    show = Show(where=False, retvalue=True)
+    show.say.setfiles([io.StringIO()])
+    layers = []
+    fmt_kwargs = show._fmt_kwargs
+
+    def spy(opts):
+        layers.append(len(opts.maps))
+        return fmt_kwargs(opts)
+
+    monkeypatch.setattr(show, '_fmt_kwargs', spy)
+    x = 1
+    assert show(x) == 'x: 1'
+    assert show(x, _argnames=['y']) == 'y: 1'     # as precompiled by importhook
+    assert show(x, sep=' ') == 'x: 1'
+    assert layers[:2] == [2, 2]
+    assert layers[2] > 2
+
+
+def test_flat_options_kept_across_scopes():
+    import threading
+    show = Show(where=False, retvalue=True)
+    show.say.setfiles([io.StringIO()])
+    x = 1
+    assert show(x) == 'x: 1'
+    snapshot = show._flat
+    results = []
+
+    def scoped():
+        with show.settings(sep=', '):
+            results.append(show(x, x))
+            results.append(show(x, x))
+
+    t = threading.Thread(target=scoped)
+    t.start()
+    t.join()
+    assert results == ['x: 1, x: 1'] * 2
+    assert show(x, x) == 'x: 1  x: 1'
+    assert show._flat is snapshot       # not displaced by the other scope
+
+
+def test_settings_per_thread():
+    import threading
+    show = Show(where=False, retvalue=True)
+    show.say.setfiles([io.StringIO()])
+    x = 1
+    entered, done = threading.Event(), threading.Event()
+    results = []
+
+    def quiet():
+        with show.settings(show=False):
+            entered.set()
+            results.append(show(x))
+            done.wait(5)
+
+    t = threading.Thread(target=quiet)
+    t.start()
+    assert entered.wait(5)
+    assert show(x) == 'x: 1'       # not silenced by the other thread's settings
+    with show.settings(sep=', '):
+        assert show(x, x) == 'x: 1, x: 1'
+        with show.settings(show=False):
+            assert show(x) is None
+        assert show(x, x) == 'x: 1, x: 1'
+    done.set()
+    t.join()
+    assert results == [None]
+    assert show(x, x) == 'x: 1  x: 1'
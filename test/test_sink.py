@@ -0,0 +1,136 @@
+
+import io
+import threading
+import pytest
+from show.sink import AsyncSink
+from show import show
+
+
+class SlowFile(object):
+    """
+    File whose writes wait until released, so the sink's queue can be filled
+    deterministically.
+    """
+    def __init__(self):
+        self.parts = []
+        self.release = threading.Event()
+        self.entered = threading.Event()
+
+    def write(self, s):
+        self.entered.set()
+        self.release.wait()
+        self.parts.append(s)
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        return ''.join(self.parts)
+
+
+def fill(policy, n=6, maxsize=2):
+    """
+    Write n records to a sink whose writer is stuck on the first one.
+    """
+    f = SlowFile()
+    sink = AsyncSink(f, maxsize=maxsize, policy=policy, batch=10)
+    sink.write('0\n')
+    assert f.entered.wait(5)    # writer holds record 0; queue empty
+    for i in range(1, n):
+        sink.write('{0}\n'.format(i))
+    f.release.set()
+    assert sink.flush(timeout=5)
+    return f, sink
+
+
+def test_async_write():
+    out = io.StringIO()
+    sink = AsyncSink(out)
+    for i in range(1000):
+        sink.write(u'line {0}\n'.format(i))
+    sink.flush()
+    assert out.getvalue().splitlines() == ['line {0}'.format(i) for i in range(1000)]
+    stats = sink.stats()
+    assert stats['written'] == 1000
+    assert stats['dropped'] == 0
+    assert stats['batches'] <= 1000
+    sink.close()
+
+
+def test_drop_newest():
+    f, sink = fill('drop-newest')
+    assert f.getvalue() == '0\n1\n2\n'
+    assert sink.stats()['dropped'] == 3
+
+
+def test_drop_oldest():
+    f, sink = fill('drop-oldest')
+    assert f.getvalue() == '0\n4\n5\n'
+    assert sink.stats()['dropped'] == 3
+
+
+def test_block():
+    f = SlowFile()
+    sink = AsyncSink(f, maxsize=1, policy='block')
+    sink.write('0\n')
+    assert f.entered.wait(5)
+    sink.write('1\n')           # fills the queue
+    t = threading.Thread(target=sink.write, args=('2\n',))
+    t.start()
+    t.join(0.1)
+    assert t.is_alive()         # blocked, waiting for room
+    f.release.set()
+    t.join(5)
+    assert not t.is_alive()
+    sink.flush()
+    assert f.getvalue() == '0\n1\n2\n'
+    assert sink.stats()['dropped'] == 0
+
+
+def test_bad_policy():
+    with pytest.raises(ValueError):
+        AsyncSink(io.StringIO(), policy='drop-everything')
+
+
+def test_use_sink():
+    out = io.StringIO()
+    s = show.clone(where=False)
+    s.say.setfiles([out])
+    sink = s.use_sink(maxsize=100)
+    assert s.say.options.files == [sink]
+    x = 12
+    s(x)
+    sink.flush()
+    assert out.getvalue() == 'x: 12\n'
+    sink.close()
+
+
+def test_deferred():
+    out = io.StringIO()
+    s = show.clone(where=False)
+    s.say.setfiles([out])
+    sink = s.use_sink(defer=True)
+    assert s.options.defer
+    items = [1, 2]
+    n = 3
+    s(items, n, 'n is {n}')
+    items.append(99)            # after the call; not shown
+    sink.flush()
+    assert out.getvalue() == 'items: [1, 2]  n: 3  n is 3\n'
+
+    with_where = show.clone(where=True)
+    with_where.say.setfiles([sink])
+    with_where(n)
+    sink.flush()
+    last = out.getvalue().splitlines()[-1]
+    assert last.startswith('test_deferred():') and last.endswith(': n: 3')
+    sink.close()
+
+
+def test_deferred_without_sink():
+    out = io.StringIO()
+    s = show.clone(where=False, defer=True)
+    s.say.setfiles([out])
+    x = {'a': 1}
+    s(x)
+    assert out.getvalue() == "x: {'a': 1}\n"
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+import io
+import array
+import math
+import random
+import pytest
+from show import show
+from show.summary import summarize, format_summary, sparkline, _Histogram
+
+
+def test_summarize_list():
+    data = [1, 2, 3, 4, float('nan'), float('inf')]
+    st = summarize(data)
+    assert st['shape'] == (6,)
+    assert st['count'] == 6
+    assert st['nan'] == 1 and st['inf'] == 1
+    assert st['min'] == 1 and st['max'] == 4
+    assert st['mean'] == 2.5
+    assert abs(st['std'] - math.sqrt(1.25)) < 1e-12
+    assert sum(st['hist']) == 4
+    assert st['dtype'] == 'int, float'
+
+
+def test_summarize_array_and_memoryview():
+    a = array.array('d', [0.5, 1.5, 2.5])
+    st = summarize(a)
+    assert st['dtype'] == 'd'
+    assert st['mean'] == 1.5
+    m = memoryview(array.array('i', range(6))).cast('B').cast('i', (2, 3))
+    st = summarize(m)
+    assert st['shape'] == (2, 3)
+    assert (st['min'], st['max'], st['count']) == (0, 5, 6)
+
+
+def test_summarize_not_numeric():
+    with pytest.raises(TypeError):
+        summarize(['a', 'b'])
+    with pytest.raises(TypeError):
+        summarize({'a': 1})
+
+
+def test_Histogram():
+    values = [random.uniform(-100, 100) for _ in range(1000)]
+    h = _Histogram(10)
+    for v in values:
+        h.add(v)
+    counts = h.counts()
+    assert sum(counts) == 1000
+    assert 0 < len(counts) <= 10
+    h = _Histogram(10)
+    for v in [7, 7, 7]:
+        h.add(v)
+    assert h.counts() == [3]
+
+
+def test_sparkline():
+    assert sparkline([1, 0, 4, 8]) == u'▁ ▄█'
+    assert sparkline([]) == ''
+
+
+def test_show_summary():
+    s = show.clone(where=False, retvalue=True)
+    s.say.setfiles([io.StringIO()])
+    x = [1.0, 2.0, 3.0, 4.0]
+    out = s.summary(x)
+    assert out.startswith(u'x: <list 4 float> min=1 max=4 mean=2.5 std=1.118 nan=0 inf=0 ')
+    assert out.endswith(u' [1, 4]')
+    name = 'why'
+    assert s.summary(name) == "name: 'why'"
+
+
+def test_summarize_threshold():
+    s = show.clone(where=False, retvalue=True)
+    s.say.setfiles([io.StringIO()])
+    x = list(range(100))
+    assert '<list' not in s(x, summarize=1000)
+    assert s(x, summarize=10).startswith('x: <list 100 int> min=0 max=99')
+
+
+def test_summarize_numpy():
+    np = pytest.importorskip('numpy')
+    a = np.array([[1.0, np.nan], [np.inf, 3.0]])
+    st = summarize(a)
+    assert st['shape'] == (2, 2)
+    assert (st['nan'], st['inf'], st['min'], st['max'], st['mean']) == (1, 1, 1.0, 3.0, 2.0)
+    assert sum(st['hist']) == 2
+    assert format_summary(st).startswith('<ndarray (2, 2) float64> min=1 max=3')
+
+
+def test_summary_unsupported():
+    s = show.clone(where=False, retvalue=True)
+    s.say.setfiles([io.StringIO()])
+    big = [10 ** 400, 1, 2]
+    assert s.summary(big).startswith('big: [')
+    assert s(big, summarize=1).startswith('big: [')
+
+
+def test_summary_unsupported_numpy():
+    np = pytest.importorskip('numpy')
+    s = show.clone(where=False, retvalue=True)
+    s.say.setfiles([io.StringIO()])
+    m = memoryview(np.zeros(3, '>i4'))
+    assert s.summary(m).startswith('m: <memory at ')
+    assert s(m, summarize=1).startswith('m: <memory at ')
+    m = memoryview(np.zeros((3, 4), '>i4'))
+    assert s.summary(m).startswith('m: <memory at ')
+    m = memoryview(np.zeros((3, 4))[:, ::2])
+    assert s.summary(m).startswith('m: <memory at ')
@@ -0,0 +1,92 @@
+
+import io
+import threading
+from show import show
+from show.writer import write_record, lock_for, ShowSay
+
+
+class TrickleFile(object):
+    """
+    File that writes a character at a time, yielding to other threads in
+    between, so unserialized writes would interleave.
+    """
+
+    def __init__(self):
+        self.chars = []
+
+    def write(self, s):
+        for c in s:
+            self.chars.append(c)
+            threading.Event().wait(0)   # give other threads a chance
+        return len(s)
+
+    def getvalue(self):
+        return ''.join(self.chars)
+
+
+def test_lock_for():
+    a, b = io.StringIO(), io.StringIO()
+    assert lock_for(a) is lock_for(a)
+    assert lock_for(a) is not lock_for(b)
+
+
+def test_lock_for_forgets():
+    import gc
+    from show.writer import _locks
+
+    class Slotted(object):
+        __slots__ = ('x',)      # not weakly referenceable
+
+    s = Slotted()
+    assert lock_for(s) is lock_for(s)
+    assert lock_for(s) is lock_for(Slotted())   # all such share one lock
+    before = len(_locks)
+    for _ in range(100):
+        lock_for(io.StringIO())
+    gc.collect()
+    assert len(_locks) <= before
+
+
+def test_write_record_single_thread_unlocked():
+    f = io.StringIO()
+    lock = lock_for(f)
+    lock.acquire()      # held elsewhere; single-threaded writes don't wait
+    try:
+        write_record(f, 'one\n')
+    finally:
+        lock.release()
+    assert f.getvalue() == 'one\n'
+
+
+def test_records_do_not_interleave():
+    f = TrickleFile()
+    s = show.clone(where=False)
+    s.say.setfiles([f])
+    nthreads, ncalls = 4, 25
+
+    def work(n):
+        label = 'thread{0}'.format(n) * 3
+        for i in range(ncalls):
+            s(label)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(nthreads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    lines = f.getvalue().splitlines()
+    assert len(lines) == nthreads * ncalls
+    expected = set("label: '{0}'".format('thread{0}'.format(n) * 3)
+                   for n in range(nthreads))
+    assert set(lines) == expected
+
+
+def test_ShowSay_returns_and_writes():
+    out = io.StringIO()
+    say = ShowSay()
+    say.setfiles([out])
+    assert say('hello') == 'hello'
+    assert out.getvalue() == 'hello\n'
+    say.set(silent=True)
+    assert say('quiet') == 'quiet'
+    assert out.getvalue() == 'hello\n'